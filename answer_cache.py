@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+answer_cache.py
+Semantic answer cache in front of agent.run
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+ANSWER_CACHE_THRESHOLD = 0.93   # cosine similarity needed to reuse an answer
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_TTL = 24 * 3600    # seconds
+
+
+# Section, CFR, EO and year numbers: "164.312", "§164.308(a)", "14028", "2021"
+_CITATION = re.compile(r"\d+(?:[.\-]\d+)*(?:\([a-z0-9]+\))*")
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def citations(question: str) -> frozenset:
+    """
+    Numeric / citation tokens; semantically close questions that cite
+    different sections or orders must not share an answer
+    """
+    return frozenset(_CITATION.findall(question.lower()))
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by (index ID, question embedding).
+
+    A lookup first tries an exact match on the normalised question, then the
+    most similar cached question of the same index above the threshold that
+    cites exactly the same numbers (sections, CFR parts, EOs).
+    Entries are evicted LRU beyond max_entries, expire after ttl, and are
+    dropped for an index whenever it is upserted to (invalidate).
+    """
+
+    def __init__(self, threshold=ANSWER_CACHE_THRESHOLD, max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                 ttl=ANSWER_CACHE_TTL, embed_fn=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._embed_fn = embed_fn
+        self._semantic = True
+        self._entries = OrderedDict()  # (index_id, normalised question) -> entry
+        self._lock = threading.Lock()
+
+    def _vector(self, question):
+        if not self._semantic:
+            return None
+        try:
+            if self._embed_fn is None:
+                from local_index import embed
+                self._embed_fn = embed
+            return self._embed_fn([question])[0]
+        except Exception as e:
+            # Fall back to exact matching only
+            self._semantic = False
+            print(f"⚠️ Semantic answer cache disabled: {e}")
+            return None
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [k for k, e in self._entries.items() if now - e["created_at"] > self.ttl]
+        for k in expired:
+            del self._entries[k]
+
+    def get(self, index_id, question):
+        key = (index_id, _normalize(question))
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry["answer"]
+            if not any(k[0] == index_id for k in self._entries):
+                return None
+
+        vector = self._vector(question)
+        if vector is None:
+            return None
+
+        cited = citations(question)
+        with self._lock:
+            candidates = [
+                (k, e) for k, e in self._entries.items()
+                if k[0] == index_id and e["vector"] is not None and e["citations"] == cited
+            ]
+            if not candidates:
+                return None
+
+            import numpy as np
+
+            sims = np.stack([e["vector"] for _, e in candidates]) @ vector
+            best = int(np.argmax(sims))
+            if sims[best] < self.threshold:
+                return None
+
+            best_key, best_entry = candidates[best]
+            self._entries.move_to_end(best_key)
+            return best_entry["answer"]
+
+    def put(self, index_id, question, answer):
+        # An empty or missing answer means the run failed or produced nothing;
+        # caching it would serve that to every near-duplicate question
+        if not isinstance(answer, str) or not answer.strip():
+            return
+        vector = self._vector(question)
+        with self._lock:
+            self._entries[(index_id, _normalize(question))] = {
+                "answer": answer,
+                "vector": vector,
+                "citations": citations(question),
+                "created_at": time.time(),
+            }
+            self._entries.move_to_end((index_id, _normalize(question)))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, index_id):
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == index_id]:
+                del self._entries[k]
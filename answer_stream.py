@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+answer_stream.py
+Print agent answers as they are produced and time the first token
+"""
+import sys
+import time
+
+from tracing import REGISTRY, span
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+STREAM_POLL_INTERVAL = 0.5  # seconds between polls when the agent cannot stream
+STREAM_TIMEOUT = 300
+
+
+def _output_text(data):
+    if data is None:
+        return ""
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        return data.get("output") or ""
+    return getattr(data, "output", None) or ""
+
+
+class StreamResult:
+    def __init__(self, text, first_token_s, total_s, mode):
+        self.text = text
+        self.first_token_s = first_token_s  # None if nothing was produced
+        self.total_s = total_s
+        self.mode = mode                    # "stream" or "poll"
+
+
+def _stream(agent, question, emit, started):
+    parts, first = [], None
+    for chunk in agent.run_stream(question):
+        text = chunk.data if isinstance(chunk.data, str) else _output_text(chunk.data)
+        if not text:
+            continue
+        if first is None:
+            first = time.perf_counter() - started
+        emit(text)
+        parts.append(text)
+    return "".join(parts), first
+
+
+def _poll(agent, question, emit, started, interval, timeout):
+    """
+    Fallback: start the run asynchronously and print whatever new output
+    each poll returns
+    """
+    response = agent.run_async(question)
+    url = getattr(response, "url", None)
+    if not url:
+        raise RuntimeError(getattr(response, "error_message", None) or "Agent run could not be started")
+
+    shown, first = "", None
+    while time.perf_counter() - started < timeout:
+        result = agent.poll(url)
+        output = _output_text(getattr(result, "data", None))
+
+        if output and output != shown:
+            if first is None:
+                first = time.perf_counter() - started
+            # Partial output normally grows; if it was rewritten, print it again
+            emit(output[len(shown):] if output.startswith(shown) else "\n" + output)
+            shown = output
+
+        if getattr(result, "completed", False):
+            if str(getattr(result, "status", "")).endswith("FAILED"):
+                raise RuntimeError(getattr(result, "error_message", "") or "Agent run failed")
+            return shown, first
+        time.sleep(interval)
+
+    raise TimeoutError(f"No complete answer after {timeout}s")
+
+
+def stream_answer(agent, question, emit=None, interval=STREAM_POLL_INTERVAL, timeout=STREAM_TIMEOUT):
+    """
+    Print the answer while it is generated. Uses native streaming when the
+    agent supports it, otherwise polls run_async output.
+    """
+    if emit is None:
+        def emit(text):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+    started = time.perf_counter()
+    with span("agent.run"):
+        if getattr(agent, "supports_streaming", False):
+            text, first = _stream(agent, question, emit, started)
+            mode = "stream"
+        else:
+            text, first = _poll(agent, question, emit, started, interval, timeout)
+            mode = "poll"
+    if first is not None:
+        REGISTRY.observe("agent.first_token", first)
+
+    emit("\n")
+    return StreamResult(text, first, time.perf_counter() - started, mode)
+
+
+def format_timing(result):
+    first = "n/a" if result.first_token_s is None else f"{result.first_token_s:.2f}s"
+    return f"⏱ first token {first} · total {result.total_s:.2f}s ({result.mode})"
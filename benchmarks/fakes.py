@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+benchmarks/fakes.py
+Simulated aiXplain backend and Federal Register endpoint for offline benchmarks
+
+Every fake call sleeps for a configurable latency (with jitter) and fails
+with a configurable probability, so timing results reflect the client code
+and its concurrency rather than a real network.
+"""
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class Latency:
+    """
+    Shared latency / failure settings for all fakes
+    """
+
+    def __init__(self, seconds=0.05, jitter=0.2, failure_rate=0.0, seed=0):
+        self.seconds = seconds
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self, what):
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        time.sleep(max(0.0, self.seconds * factor))
+        if fail:
+            raise RuntimeError(f"simulated {what} failure")
+
+
+class FakeResponse:
+    def __init__(self, data, status="SUCCESS", completed=True, url=None):
+        self.data = data
+        self.status = status
+        self.completed = completed
+        self.url = url
+        self.error_message = ""
+
+
+class FakeRecord:
+    def __init__(self, id=None, value="", value_type="text", attributes=None, uri=""):
+        self.id = id
+        self.value = value
+        self.value_type = value_type
+        self.attributes = attributes or {}
+        self.uri = uri
+
+
+class FakeSplitter:
+    def __init__(self, split=False, split_by="word", split_length=1, split_overlap=0):
+        self.split = split
+        self.split_by = split_by
+        self.split_length = split_length
+        self.split_overlap = split_overlap
+
+
+class FakeSplittingOptions:
+    WORD = "word"
+    SENTENCE = "sentence"
+    PASSAGE = "passage"
+    PAGE = "page"
+    LINE = "line"
+
+
+class FakeIndex:
+    def __init__(self, index_id, name, latency, description=""):
+        self.id = index_id
+        self.name = name
+        self.description = description
+        self.latency = latency
+        self.documents = {}
+        self.upserted_bytes = 0
+        self._lock = threading.Lock()
+
+    def prepare_record_from_file(self, file_path, file_id=None):
+        self.latency.wait("prepare_record_from_file")
+        with open(file_path, "rb") as f:
+            size = len(f.read())
+        return FakeRecord(id=file_id or hashlib.sha1(file_path.encode()).hexdigest(),
+                          value=f"<{size} bytes>", attributes={"file_name": file_path})
+
+    def upsert(self, documents, splitter=None):
+        self.latency.wait("upsert")
+        if isinstance(documents, str):
+            documents = [FakeRecord(id=documents, value=documents, attributes={"url": documents})]
+        with self._lock:
+            for doc in documents:
+                self.documents[doc.id] = doc
+                self.upserted_bytes += len(str(doc.value).encode("utf-8"))
+        return FakeResponse([{"document_id": doc.id} for doc in documents])
+
+    def search(self, query, top_k=10, filters=None):
+        self.latency.wait("search")
+        with self._lock:
+            docs = list(self.documents.values())[:top_k]
+        return FakeResponse([
+            {"id": d.id, "document": d.id, "score": 1.0 / (n + 1), "data": str(d.value),
+             "metadata": dict(d.attributes)}
+            for n, d in enumerate(docs)
+        ])
+
+    def count(self):
+        self.latency.wait("count")
+        return len(self.documents)
+
+    def info(self):
+        return {"num_documents": self.count()}
+
+    def get_record(self, record_id):
+        self.latency.wait("get_record")
+        doc = self.documents.get(record_id)
+        return FakeResponse([{"id": record_id}] if doc else [])
+
+    def delete_record(self, record_id):
+        self.latency.wait("delete_record")
+        with self._lock:
+            self.documents.pop(record_id, None)
+        return FakeResponse([])
+
+
+class FakeCrossEncoder:
+    """
+    Stand-in for sentence_transformers.CrossEncoder: term overlap as the
+    score, with a simulated per-pair CPU cost
+    """
+
+    def __init__(self, seconds_per_pair=0.002):
+        self.seconds_per_pair = seconds_per_pair
+        self.pairs_scored = 0
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        time.sleep(self.seconds_per_pair * len(pairs))
+        self.pairs_scored += len(pairs)
+        return [len(set(query.lower().split()) & set(passage.lower().split())) / (1 + len(passage) / 1000)
+                for query, passage in pairs]
+
+
+class FakeAgent:
+    def __init__(self, agent_id, name, latency, tools=None):
+        self.id = agent_id
+        self.name = name
+        self.latency = latency
+        self.tools = list(tools or [])
+        self.instructions = ""
+        self.supports_streaming = False
+
+    def run(self, query=None, **kwargs):
+        self.latency.wait("agent.run")
+        return FakeResponse(types.SimpleNamespace(output=f"Answer to: {query}"))
+
+    def run_async(self, query=None, **kwargs):
+        return FakeResponse(None, status="IN_PROGRESS", completed=False, url=f"fake://{query}")
+
+    def poll(self, url):
+        result = self.run(url[len("fake://"):])
+        return result
+
+
+class FakeTool:
+    def __init__(self, tool_id, latency):
+        self.id = tool_id
+        self.name = "connector-aixplain-slack"
+        self.latency = latency
+        self.messages = []
+
+    def execute(self, payload):
+        self.latency.wait("slack")
+        self.messages.append(payload)
+
+
+class FakeBackend:
+    """
+    Factory stand-ins with shared state, plus install() to expose them
+    under the aixplain module names the scripts import
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.indexes = {}
+        self.agents = {}
+        backend = self
+
+        class IndexFactory:
+            @staticmethod
+            def get(index_id):
+                backend.latency.wait("IndexFactory.get")
+                if index_id not in backend.indexes:
+                    backend.indexes[index_id] = FakeIndex(index_id, index_id, backend.latency)
+                return backend.indexes[index_id]
+
+            @staticmethod
+            def create(name, description="", embedding_model=None, **kwargs):
+                backend.latency.wait("IndexFactory.create")
+                index_id = hashlib.sha1(name.encode()).hexdigest()[:24]
+                backend.indexes[index_id] = FakeIndex(index_id, name, backend.latency, description)
+                return backend.indexes[index_id]
+
+            @staticmethod
+            def list(**kwargs):
+                backend.latency.wait("IndexFactory.list")
+                return {"results": list(backend.indexes.values())}
+
+        class AgentFactory:
+            @staticmethod
+            def get(agent_id):
+                backend.latency.wait("AgentFactory.get")
+                if agent_id not in backend.agents:
+                    backend.agents[agent_id] = FakeAgent(agent_id, "Policy Navigator", backend.latency)
+                return backend.agents[agent_id]
+
+            @staticmethod
+            def list(**kwargs):
+                backend.latency.wait("AgentFactory.list")
+                return {"results": list(backend.agents.values())}
+
+            @staticmethod
+            def create(name, description="", instructions="", tools=None, **kwargs):
+                backend.latency.wait("AgentFactory.create")
+                agent = FakeAgent(f"agent-{len(backend.agents)}", name, backend.latency, tools)
+                backend.agents[agent.id] = agent
+                return agent
+
+        class ToolFactory:
+            @staticmethod
+            def get(tool_id):
+                backend.latency.wait("ToolFactory.get")
+                return FakeTool(tool_id, backend.latency)
+
+        class FileFactory:
+            @staticmethod
+            def upload(path, **kwargs):
+                backend.latency.wait("FileFactory.upload")
+                return path
+
+        self.IndexFactory = IndexFactory
+        self.record_cls = FakeRecord
+        self.AgentFactory = AgentFactory
+        self.ToolFactory = ToolFactory
+        self.FileFactory = FileFactory
+
+    def install(self):
+        """
+        Register fake aixplain modules in sys.modules (before importing the scripts)
+        """
+        def module(name, **attrs):
+            mod = types.ModuleType(name)
+            mod.__dict__.update(attrs)
+            sys.modules[name] = mod
+            return mod
+
+        module("aixplain")
+        module("aixplain.factories", AgentFactory=self.AgentFactory, IndexFactory=self.IndexFactory,
+               FileFactory=self.FileFactory, ToolFactory=self.ToolFactory)
+        module("aixplain.factories.tool_factory", ToolFactory=self.ToolFactory)
+        module("aixplain.modules")
+        module("aixplain.modules.model")
+        module("aixplain.modules.model.record", Record=FakeRecord)
+        module("aixplain.modules.model.index_model", Splitter=FakeSplitter)
+        module("aixplain.enums")
+        module("aixplain.enums.splitting_options", SplittingOptions=FakeSplittingOptions)
+
+
+class FakeFederalRegister:
+    """
+    Local stand-in for /api/v1/documents.json with ETag revalidation
+    """
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                owner.requests += 1
+                owner.latency.wait("federal_register")
+                query = parse_qs(urlsplit(self.path).query)
+                term = query.get("conditions[term]", [""])[0]
+                number = term.split()[-1] if term else "0"
+                body = json.dumps({"results": [{
+                    "title": f"Executive Order {number}",
+                    "publication_date": "2024-01-01",
+                    "document_type": "Presidential Document",
+                    "html_url": f"https://www.federalregister.gov/eo/{number}",
+                }]}).encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+                if self.headers.get("If-None-Match") == etag:
+                    owner.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/documents.json"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeWebsite:
+    """
+    Local guidance site for crawl tests: a sitemap, robots.txt (one
+    disallowed path) and `pages` linked HTML pages served with ETag and
+    Last-Modified. touch(n) changes one page's content.
+    """
+
+    def __init__(self, latency, pages=50):
+        self.latency = latency
+        self.pages = pages
+        self.versions = {}
+        self.requests = 0
+        self.not_modified = 0
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, body, content_type, etag=None):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                owner.requests += 1
+                path = urlsplit(self.path).path
+                if path == "/robots.txt":
+                    return self.send_body(b"User-agent: *\nDisallow: /guidance/private\n", "text/plain")
+                if path == "/sitemap.xml":
+                    locs = "".join(f"<url><loc>{owner.url}/guidance/page-{n}.html</loc></url>"
+                                   for n in range(0, owner.pages, 10))
+                    body = ('<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/'
+                            f'sitemap/0.9">{locs}</urlset>').encode("utf-8")
+                    return self.send_body(body, "application/xml")
+
+                owner.latency.wait("website")
+                name = path.rsplit("/", 1)[-1]
+                if not (name.startswith("page-") and name.endswith(".html")):
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                n = int(name[len("page-"):-len(".html")])
+                if n >= owner.pages:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                version = owner.versions.get(n, 0)
+                etag = f'"page-{n}-v{version}"'
+                if self.headers.get("If-None-Match") == etag:
+                    owner.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                links = "".join(f'<a href="page-{m}.html#top">Section {m}</a>'
+                                for m in (n + 1, n + 2, (n * 7) % owner.pages) if m < owner.pages)
+                body = (f"<html><head><title>Guidance {n}</title><script>var x = 1;</script></head>"
+                        f"<body><h1>Guidance {n} (v{version})</h1><p>Section {n}.1 requires "
+                        f"data minimization under 16 CFR {300 + n}.</p>{links}"
+                        f'<a href="/guidance/private/notes.html">private</a>'
+                        f'<a href="https://example.com/elsewhere">external</a></body></html>')
+                self.send_body(body.encode("utf-8"), "text/html; charset=utf-8", etag)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def touch(self, n):
+        self.versions[n] = self.versions.get(n, 0) + 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
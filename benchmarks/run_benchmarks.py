@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+benchmarks/run_benchmarks.py
+Offline end-to-end benchmarks against the simulated aiXplain backend
+
+Usage:
+  python3 benchmarks/run_benchmarks.py --latency-ms 50 --output bench.json
+
+Prints (or writes) one JSON document with throughput, latency percentiles
+and peak RSS per scenario, so runs can be diffed for regressions.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeBackend, FakeCrossEncoder, FakeFederalRegister, FakeWebsite, Latency
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_stats(latencies):
+    return {
+        "ops": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def hashing_embed(texts):
+    """
+    Cheap deterministic stand-in for the sentence-transformers encoder
+    """
+    out = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.lower().split():
+            out[row, hash(word) % 64] += 1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.where(norms == 0, 1, norms)
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# -----------------------------
+# SCENARIOS
+# -----------------------------
+
+def bench_ingest_csv(rag_agent, workdir, rows):
+    path = os.path.join(workdir, "rows.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,agency,title,effective_date\n")
+        for i in range(rows):
+            f.write(f"{i},Agency {i % 40},Regulation {i} on data privacy and security,2024-01-{i % 28 + 1:02d}\n")
+
+    started = time.perf_counter()
+    with quiet():
+        rag_agent.ingest_csv(path)
+    wall = time.perf_counter() - started
+    return {"records": rows + 1, "wall_s": round(wall, 3),
+            "records_per_s": round((rows + 1) / wall, 1)}
+
+
+def bench_ingest_splt_pdf(policy_navigator, backend, workdir, pages, pages_per_chunk):
+    from pypdf import PdfWriter
+
+    path = os.path.join(workdir, "policy.pdf")
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    index = backend.IndexFactory.create(name="PolicyNavigator::bench-pdf")
+    policy_navigator.input = lambda prompt="": path
+    started = time.perf_counter()
+    with quiet():
+        policy_navigator.ingest_splt_pdf(index, max_pages=pages_per_chunk)
+    wall = time.perf_counter() - started
+    chunks = len(index.documents)
+    return {"pages": pages, "chunks": chunks, "wall_s": round(wall, 3),
+            "chunks_per_s": round(chunks / wall, 2)}
+
+
+def bench_ingest_splt_csv(policy_navigator, backend, workdir, rows, max_bytes):
+    path = os.path.join(workdir, "large.csv")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,agency,title\n")
+        for i in range(rows):
+            f.write(f"{i},Agency {i % 40},Rule {i} on consumer protection\n")
+
+    index = backend.IndexFactory.create(name="PolicyNavigator::bench-csv")
+    policy_navigator.input = lambda prompt="": path
+    started = time.perf_counter()
+    with quiet():
+        policy_navigator.ingest_splt_csv(index, max_bytes=max_bytes)
+    wall = time.perf_counter() - started
+    return {"rows": rows, "chunks": len(index.documents), "wall_s": round(wall, 3),
+            "rows_per_s": round(rows / wall, 1)}
+
+
+def bench_crawl(backend, latency, pages):
+    from crawler import crawl_ingest
+
+    index = backend.IndexFactory.create(name="PolicyNavigator::bench-web")
+    with FakeWebsite(latency, pages) as site:
+        seeds = [site.url + "/sitemap.xml", site.url + "/guidance/page-0.html"]
+
+        def run_pass():
+            started = time.perf_counter()
+            with quiet():
+                summary = crawl_ingest(index, seeds, backend.record_cls, max_pages=pages * 2,
+                                       max_depth=pages, host_delay=0)
+            return summary, time.perf_counter() - started
+
+        cold, cold_s = run_pass()
+        site.touch(1)
+        warm, warm_s = run_pass()
+        if cold["new"] != pages or warm["changed"] != 1:
+            raise RuntimeError(f"unexpected crawl counts: {cold} / {warm}")
+        return {"pages": pages, "cold_s": round(cold_s, 3),
+                "cold_pages_per_s": round(pages / cold_s, 1),
+                "recrawl_s": round(warm_s, 3), "recrawl_changed": warm["changed"],
+                "recrawl_not_modified": site.not_modified}
+
+
+def bench_fanout_search(policy_navigator, backend, indexes, questions):
+    from retrieval import fan_out_search, reciprocal_rank_fusion, search_index
+
+    handles = []
+    for n in range(indexes):
+        index = backend.IndexFactory.create(name=f"PolicyNavigator::bench-topic-{n}")
+        index.upsert([backend.record_cls(id=f"t{n}-d{d}", value=f"Topic {n} rule {d}")
+                      for d in range(20)])
+        handles.append(index)
+
+    sequential, fanned = [], []
+    for q in range(questions):
+        query = f"rule {q}"
+        started = time.perf_counter()
+        for index in handles:
+            search_index(index, query)
+        sequential.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        rankings, _, errors = fan_out_search(handles, query)
+        hits = reciprocal_rank_fusion(rankings)
+        fanned.append(time.perf_counter() - started)
+        if errors or not hits:
+            raise RuntimeError(f"fan-out search failed: {errors}")
+    return {"indexes": indexes, "sequential": latency_stats(sequential),
+            "fan_out": latency_stats(fanned)}
+
+
+def bench_rerank(questions):
+    from reranker import RERANK_CANDIDATES, ScoreCache, rerank
+    from retrieval import FANOUT_TOP_K, build_context, reciprocal_rank_fusion
+
+    rankings = [[{"key": f"i{n}:d{d}", "index_id": f"i{n}", "index_name": "", "id": f"d{d}",
+                  "document": f"d{d}", "metadata": {},
+                  "data": f"Rule {d} of topic {n}: " + "filler text for the passage " * 40}
+                 for d in range(RERANK_CANDIDATES)] for n in range(2)]
+    model, cache = FakeCrossEncoder(), ScoreCache()
+
+    cold, warm, fused_chars, reranked_chars = [], [], 0, 0
+    for q in range(questions):
+        query = f"what does rule {q} require"
+        candidates = reciprocal_rank_fusion(rankings, top_k=RERANK_CANDIDATES)
+        for latencies in (cold, warm):
+            started = time.perf_counter()
+            hits = rerank(query, candidates, model=model, cache=cache)
+            latencies.append(time.perf_counter() - started)
+        fused_chars += len(build_context(candidates[:FANOUT_TOP_K]))
+        reranked_chars += len(build_context(hits))
+    return {"candidates": RERANK_CANDIDATES, "cold": latency_stats(cold), "warm": latency_stats(warm),
+            "pairs_scored": model.pairs_scored,
+            "context_chars_fused": fused_chars // questions,
+            "context_chars_reranked": reranked_chars // questions}
+
+
+def bench_eo_route(rag_agent, agent, questions):
+    def run_pass():
+        latencies = []
+        for n in range(questions):
+            q = f"Compare Executive Order {14000 + 2 * n} and {14001 + 2 * n}"
+            started = time.perf_counter()
+            route, _ = rag_agent.answer_question(agent, q)
+            latencies.append(time.perf_counter() - started)
+            if route != "eo":
+                raise RuntimeError(f"expected the EO route, got {route}")
+        return latencies
+
+    cold = run_pass()
+    warm = run_pass()
+    return {"cold": latency_stats(cold), "warm": latency_stats(warm)}
+
+
+def bench_rag_route(rag_agent, agent, workdir, questions, concurrency):
+    latencies = []
+    for n in range(questions):
+        started = time.perf_counter()
+        route, _ = rag_agent.answer_question(agent, f"What does regulation {n} require?")
+        latencies.append(time.perf_counter() - started)
+        if route != "rag":
+            raise RuntimeError(f"expected the RAG route, got {route}")
+
+    path = os.path.join(workdir, "questions.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(questions):
+            f.write(f"Which agency enforces rule {n}?\n")
+    with quiet():
+        summary = rag_agent.run_batch(agent, path, os.path.join(workdir, "batch.jsonl"),
+                                      concurrency=concurrency, rate=0)
+    return {"sequential": latency_stats(latencies),
+            "batch": {"concurrency": concurrency, "throughput_qps": summary["throughput_qps"],
+                      "p50_s": summary["p50_s"], "p95_s": summary["p95_s"]}}
+
+
+# -----------------------------
+# MAIN
+# -----------------------------
+
+SCENARIOS = ("ingest_csv", "ingest_splt_pdf", "ingest_splt_csv", "fanout_search",
+             "eo_route", "rerank", "crawl", "rag_route")
+
+
+def run_scenario(name, args):
+    """
+    Run one scenario in this process; peak RSS is therefore that scenario's
+    own (plus the shared imports), not a running maximum over earlier ones
+    """
+    workdir = tempfile.mkdtemp(prefix="pn-bench-")
+    os.environ["POLICY_NAVIGATOR_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ.setdefault("POLICY_NAVIGATOR_STREAM", "0")
+
+    latency = Latency(args.latency_ms / 1000, args.jitter, args.failure_rate, args.seed)
+    backend = FakeBackend(latency)
+    backend.install()
+
+    try:
+        with quiet():
+            import rag_agent
+            from answer_cache import SemanticAnswerCache
+            from http_cache import HttpCache
+            agent = rag_agent.load_agent()
+            if name in ("ingest_splt_pdf", "ingest_splt_csv", "fanout_search"):
+                import policy_navigator
+
+        # Exact-match hits only, so every distinct benchmark question takes the RAG path
+        rag_agent.ANSWER_CACHE = SemanticAnswerCache(threshold=1.01, embed_fn=hashing_embed)
+
+        if name == "ingest_csv":
+            metrics = bench_ingest_csv(rag_agent, workdir, args.csv_rows)
+        elif name == "ingest_splt_pdf":
+            metrics = bench_ingest_splt_pdf(policy_navigator, backend, workdir, args.pdf_pages, 20)
+        elif name == "ingest_splt_csv":
+            metrics = bench_ingest_splt_csv(policy_navigator, backend, workdir, args.csv_rows, 64 * 1024)
+        elif name == "fanout_search":
+            metrics = bench_fanout_search(policy_navigator, backend, args.fanout_indexes, args.questions)
+        elif name == "eo_route":
+            with FakeFederalRegister(latency) as federal_register:
+                rag_agent.FEDERAL_REGISTER_API = federal_register.url
+                rag_agent.EO_CACHE = HttpCache(directory=os.path.join(workdir, "http"))
+                metrics = bench_eo_route(rag_agent, agent, args.questions)
+                metrics["upstream_requests"] = federal_register.requests
+        elif name == "rerank":
+            metrics = bench_rerank(args.questions)
+        elif name == "crawl":
+            metrics = bench_crawl(backend, latency, args.crawl_pages)
+        else:
+            metrics = bench_rag_route(rag_agent, agent, workdir, args.questions, args.concurrency)
+        metrics["status"] = "ok"
+    except ImportError as e:
+        metrics = {"status": "skipped", "reason": str(e)}
+    except Exception as e:
+        metrics = {"status": "error", "reason": f"{type(e).__name__}: {e}"}
+    finally:
+        # Background keyword indexing writes into the work directory too
+        for thread in threading.enumerate():
+            if thread.name == "keyword-index":
+                thread.join()
+        shutil.rmtree(workdir, ignore_errors=True)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def run_in_subprocess(name, argv):
+    fd, path = tempfile.mkstemp(prefix=f"pn-bench-{name}-", suffix=".json")
+    os.close(fd)
+    try:
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), *argv,
+                                    "--scenario", name, "--output", path],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            return {"status": "error", "reason": lines[-1] if lines else f"exit code {completed.returncode}"}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Policy Navigator benchmarks")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated backend latency")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative latency jitter")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Simulated failure probability")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv-rows", type=int, default=20000)
+    parser.add_argument("--pdf-pages", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--crawl-pages", type=int, default=100)
+    parser.add_argument("--fanout-indexes", type=int, default=6)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scenario", choices=SCENARIOS,
+                        help="Run only this scenario, in this process")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    if args.scenario:
+        # Child run: write just this scenario's metrics
+        text = json.dumps(run_scenario(args.scenario, args))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return
+
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "scenario"},
+        "scenarios": {},
+    }
+
+    # Each scenario gets a fresh interpreter so its peak RSS is its own
+    argv = [f"--{k.replace('_', '-')}={v}" for k, v in vars(args).items()
+            if k not in ("scenario", "output")]
+    for name in SCENARIOS:
+        results["scenarios"][name] = run_in_subprocess(name, argv)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"📊 Benchmark results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
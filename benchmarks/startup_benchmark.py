@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+benchmarks/startup_benchmark.py
+Cold-start timings for the CLIs, each measured in a fresh interpreter
+
+Usage:
+  python3 benchmarks/startup_benchmark.py --runs 10 --output startup.json
+
+Reports median / max wall time for importing each script, for
+`rag_agent.py --help`, and for policy_navigator's time-to-prompt (until
+the main menu asks for input). Nothing here touches the network.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_once(argv, env, stdin_text=None, until=None):
+    """
+    Wall time of one subprocess run; with `until`, stop the clock as soon
+    as that text appears on stdout (the process is then fed stdin_text)
+    """
+    started = time.perf_counter()
+    proc = subprocess.Popen(argv, cwd=ROOT, env=env, stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    if until is None:
+        proc.communicate(stdin_text.encode() if stdin_text else None)
+        elapsed = time.perf_counter() - started
+    else:
+        seen = b""
+        while until.encode() not in seen:
+            byte = proc.stdout.read(1)
+            if not byte:
+                raise RuntimeError(f"{' '.join(argv)} exited before printing {until!r}")
+            seen += byte
+        elapsed = time.perf_counter() - started
+        proc.communicate(stdin_text.encode() if stdin_text else None)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {proc.returncode}")
+    return elapsed
+
+
+def measure(argv, env, runs, **kwargs):
+    try:
+        times = [run_once(argv, env, **kwargs) for _ in range(runs)]
+    except Exception as e:
+        return {"status": "error", "reason": str(e)}
+    return {"status": "ok", "runs": runs,
+            "median_ms": round(statistics.median(times) * 1000, 1),
+            "max_ms": round(max(times) * 1000, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Policy Navigator startup benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pn-startup-") as workdir:
+        env = dict(os.environ,
+                   POLICY_NAVIGATOR_CACHE_DIR=os.path.join(workdir, "cache"),
+                   POLICY_NAVIGATOR_INDEX_BACKEND="local",
+                   PYTHONUNBUFFERED="1")
+        python = sys.executable
+
+        scenarios = {
+            "python_baseline": measure([python, "-c", "pass"], env, args.runs),
+            "import_rag_agent": measure([python, "-c", "import rag_agent"], env, args.runs),
+            "import_policy_navigator": measure([python, "-c", "import policy_navigator"], env, args.runs),
+            "rag_agent_help": measure([python, "rag_agent.py", "--help"], env, args.runs),
+            "policy_navigator_prompt": measure([python, "policy_navigator.py"], env, args.runs,
+                                               stdin_text="0\n", until="> "),
+            # What a module-level SDK import would add back (errors without the SDK or an API key)
+            "import_aixplain_factories": measure([python, "-c", "import aixplain.factories"],
+                                                 env, args.runs),
+        }
+
+    results = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "scenarios": scenarios,
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"📊 Startup results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
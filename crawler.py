@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+crawler.py
+Concurrent, polite website crawl that ingests only new or changed pages
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from http_cache import get_session
+from ingest_manifest import content_record_id
+from settings import CACHE_DIR
+from tracing import span
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+CRAWL_STATE_DIR = os.path.join(CACHE_DIR, "crawl")
+CRAWL_MAX_PAGES = 200
+CRAWL_MAX_DEPTH = 3
+CRAWL_WORKERS = 8           # pages fetched at the same time overall
+CRAWL_PER_HOST = 2          # ... and per host
+CRAWL_HOST_DELAY = 0.5      # seconds between request starts per host (robots Crawl-delay wins if larger)
+CRAWL_TIMEOUT = 15
+CRAWL_MAX_PAGE_BYTES = 5 * 1024 * 1024
+CRAWL_MAX_REDIRECTS = 5
+CRAWL_BATCH_RECORDS = 50    # page records per upsert
+USER_AGENT = "PolicyNavigatorBot/1.0"
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+_BLOCK_TAGS = {"p", "div", "li", "br", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+               "section", "article", "header", "footer", "table", "ul", "ol"}
+
+
+def is_public_url(url):
+    """
+    http(s) URL whose host resolves only to public (globally routable) addresses
+    """
+    import ipaddress
+    import socket
+
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        infos = socket.getaddrinfo(parts.hostname, port)
+    except (OSError, UnicodeError, ValueError):
+        return False
+    return all(ipaddress.ip_address(info[4][0].split("%")[0]).is_global for info in infos)
+
+
+class _PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.links = []
+        self.noindex = False
+        self.nofollow = False
+        self._parts = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in _SKIP_TAGS:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a" and attrs.get("href"):
+            self.links.append(attrs["href"])
+        elif tag == "meta" and (attrs.get("name") or "").lower() == "robots":
+            content = (attrs.get("content") or "").lower()
+            self.noindex = "noindex" in content or "none" in content
+            self.nofollow = "nofollow" in content or "none" in content
+        if tag in _BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS and self._skip:
+            self._skip -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self._parts.append(data)
+
+    @property
+    def text(self):
+        lines = (re.sub(r"\s+", " ", line).strip() for line in "".join(self._parts).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+class CrawlState:
+    """
+    Per-index record of crawled pages: validators (ETag / Last-Modified),
+    content hash and outgoing links, so unchanged pages are skipped and
+    their links still followed on the next crawl
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pages = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.pages = json.load(f)
+            except (OSError, ValueError):
+                self.pages = {}
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.pages, f)
+        os.replace(tmp, self.path)
+
+
+def state_path(index_id):
+    return os.path.join(CRAWL_STATE_DIR, f"{index_id}.json")
+
+
+class PageResult:
+    def __init__(self, url, status, depth, title="", text="", links=(), entry=None, error=None):
+        self.url = url
+        self.status = status  # new | changed | unchanged | gone | skipped | error
+        self.depth = depth
+        self.title = title
+        self.text = text
+        self.links = list(links)
+        self.entry = entry    # CrawlState entry to store once the page is ingested
+        self.error = error
+
+
+class HostLimiter:
+    """
+    At most per_host requests in flight per host, started at least
+    `delay` seconds apart
+    """
+
+    def __init__(self, per_host=CRAWL_PER_HOST, delay=CRAWL_HOST_DELAY):
+        self.per_host = per_host
+        self.delay = delay
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = [threading.Semaphore(self.per_host), threading.Lock(), 0.0]
+            return self._hosts[host]
+
+    def acquire(self, host, delay=None):
+        slots, lock, _ = state = self._host(host)
+        slots.acquire()
+        with lock:
+            wait_s = state[2] - time.monotonic()
+            if wait_s > 0:
+                time.sleep(wait_s)
+            state[2] = time.monotonic() + max(self.delay, delay or 0)
+
+    def release(self, host):
+        self._host(host)[0].release()
+
+
+class Crawler:
+    def __init__(self, seeds, state, session=None, max_pages=CRAWL_MAX_PAGES,
+                 max_depth=CRAWL_MAX_DEPTH, workers=CRAWL_WORKERS, per_host=CRAWL_PER_HOST,
+                 host_delay=CRAWL_HOST_DELAY, user_agent=USER_AGENT, timeout=CRAWL_TIMEOUT,
+                 public_only=False):
+        self.seeds = list(seeds)
+        self.state = state
+        self.session = session or get_session()
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.workers = workers
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.public_only = public_only  # refuse private/internal hosts, redirects included
+        self.limiter = HostLimiter(per_host, host_delay)
+        self._robots = {}
+        self._robots_lock = threading.Lock()
+        # Sitemap seeds open their whole host; page seeds their directory
+        self.scopes = {self._scope(url) for url in self.seeds}
+
+    # ---------- scope / robots ----------
+    @staticmethod
+    def _is_sitemap(url):
+        return urlsplit(url).path.lower().endswith(".xml")
+
+    def _scope(self, url):
+        parts = urlsplit(url)
+        path = "/" if self._is_sitemap(url) else parts.path[:parts.path.rfind("/") + 1] or "/"
+        return f"{parts.scheme}://{parts.netloc}{path}"
+
+    def in_scope(self, url):
+        return any(url.startswith(scope) for scope in self.scopes)
+
+    def _robots_for(self, url):
+        from urllib.robotparser import RobotFileParser
+
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._robots_lock:
+            if origin in self._robots:
+                return self._robots[origin]
+
+        parser = RobotFileParser(origin + "/robots.txt")
+        try:
+            r = self._request(origin + "/robots.txt")
+            if r.status_code >= 500:
+                parser.disallow_all = True
+            elif r.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(r.text.splitlines())
+        except Exception as e:
+            print(f"⚠️ robots.txt unavailable for {origin}, skipping host: {e}")
+            parser.disallow_all = True
+
+        with self._robots_lock:
+            return self._robots.setdefault(origin, parser)
+
+    # ---------- fetching ----------
+    def _request(self, url, headers=None):
+        """
+        GET that follows redirects itself, so with public_only every hop's
+        host is checked before it is contacted
+        """
+        for _ in range(CRAWL_MAX_REDIRECTS + 1):
+            if self.public_only and not is_public_url(url):
+                raise ValueError(f"{urlsplit(url).hostname} is not a public host")
+            r = self.session.get(url, timeout=self.timeout, allow_redirects=False,
+                                 headers={"User-Agent": self.user_agent, **(headers or {})})
+            if not r.is_redirect:
+                return r
+            url = urljoin(url, r.headers["Location"])
+        raise ValueError(f"More than {CRAWL_MAX_REDIRECTS} redirects")
+
+    def _get(self, url, headers=None):
+        host = urlsplit(url).netloc
+        robots = self._robots_for(url)
+        self.limiter.acquire(host, robots.crawl_delay(self.user_agent))
+        try:
+            with span("crawl.fetch"):
+                return self._request(url, headers)
+        finally:
+            self.limiter.release(host)
+
+    def _sitemap_urls(self, url, depth=0):
+        """
+        Page URLs listed in a sitemap (following nested sitemap indexes)
+        """
+        import xml.etree.ElementTree as ET
+
+        if depth > 2 or not self._robots_for(url).can_fetch(self.user_agent, url):
+            return []
+        r = self._get(url)
+        r.raise_for_status()
+        root = ET.fromstring(r.content)
+        locs = [el.text.strip() for el in root.iter() if el.tag.endswith("loc") and el.text]
+        if root.tag.endswith("sitemapindex"):
+            return [page for loc in locs for page in self._sitemap_urls(loc, depth + 1)]
+        return locs
+
+    def fetch(self, url, depth):
+        """
+        Fetch one page conditionally and classify it against the crawl state
+        """
+        if not self._robots_for(url).can_fetch(self.user_agent, url):
+            return PageResult(url, "skipped", depth, error="disallowed by robots.txt")
+
+        previous = self.state.pages.get(url)
+        headers = {}
+        if previous and previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous and previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+        try:
+            r = self._get(url, headers)
+        except Exception as e:
+            return PageResult(url, "error", depth, error=e)
+
+        if r.status_code == 304 and previous:
+            return PageResult(url, "unchanged", depth, links=previous.get("links", []))
+        if r.status_code in (404, 410):
+            return PageResult(url, "gone" if previous else "skipped", depth, error=f"HTTP {r.status_code}")
+        if r.status_code >= 400:
+            return PageResult(url, "error", depth, error=f"HTTP {r.status_code}")
+
+        final_url = urldefrag(r.url)[0]
+        content_type = r.headers.get("Content-Type", "")
+        if "html" not in content_type and "text/plain" not in content_type:
+            return PageResult(url, "skipped", depth, error=f"content type {content_type or 'unknown'}")
+        if len(r.content) > CRAWL_MAX_PAGE_BYTES or not self.in_scope(final_url):
+            return PageResult(url, "skipped", depth, error="too large or redirected out of scope")
+
+        page = _PageParser()
+        page.feed(r.text)
+        links = []
+        if not page.nofollow:
+            for href in page.links:
+                link = urldefrag(urljoin(final_url, href))[0]
+                if urlsplit(link).scheme in ("http", "https") and self.in_scope(link):
+                    links.append(link)
+
+        text = page.text
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        entry = {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "hash": digest,
+            "links": links,
+            "title": page.title.strip(),
+            "crawled_at": time.time(),
+        }
+        if page.noindex:
+            return PageResult(url, "skipped", depth, links=links, error="noindex")
+        if not text.strip():
+            # JS-rendered shells, framesets, image-only pages: an empty text
+            # record would fail validation and take its whole batch with it
+            return PageResult(url, "skipped", depth, links=links, error="no text")
+        if previous and previous.get("hash") == digest:
+            return PageResult(url, "unchanged", depth, links=links, entry=entry)
+        return PageResult(url, "changed" if previous else "new", depth,
+                          title=entry["title"], text=text, links=links, entry=entry)
+
+    # ---------- frontier ----------
+    def crawl(self):
+        """
+        Yield PageResult objects as pages complete. Up to `workers` pages
+        are fetched concurrently, subject to the per-host limiter.
+        """
+        frontier, seen = [], set()
+
+        def enqueue(url, depth):
+            if url not in seen and len(seen) < self.max_pages:
+                seen.add(url)
+                frontier.append((url, depth))
+
+        for seed in self.seeds:
+            if self._is_sitemap(seed):
+                try:
+                    for url in self._sitemap_urls(seed):
+                        if self.in_scope(url):
+                            enqueue(url, 0)
+                except Exception as e:
+                    print(f"⚠️ Sitemap failed: {seed}: {e}")
+            else:
+                enqueue(urldefrag(seed)[0], 0)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crawl") as pool:
+            running = set()
+            while frontier or running:
+                while frontier and len(running) < self.workers:
+                    url, depth = frontier.pop(0)
+                    running.add(pool.submit(self.fetch, url, depth))
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result.depth < self.max_depth:
+                        for link in result.links:
+                            enqueue(link, result.depth + 1)
+                    yield result
+
+
+def crawl_ingest(index, seeds, record_cls, batch_records=CRAWL_BATCH_RECORDS,
+                 on_upsert=None, on_delete=None, **crawler_kwargs):
+    """
+    Crawl from seed URLs / sitemaps and upsert new or changed pages as text
+    records (batched). Pages that disappeared (404/410) are deleted from the
+    index. The crawl state is only advanced for pages that were ingested.
+    on_upsert(records) / on_delete(record_id) mirror changes elsewhere.
+    Returns a summary dict of page counts per status plus upserted IDs;
+    new/changed/gone pages are only counted once their upsert or delete
+    succeeded.
+    """
+    state = CrawlState(state_path(index.id))
+    crawler = Crawler(seeds, state, **crawler_kwargs)
+    summary = {"new": 0, "changed": 0, "unchanged": 0, "gone": 0, "skipped": 0,
+               "error": 0, "failed_upserts": 0, "failed_deletes": 0, "ids": []}
+    batch, entries, statuses = [], {}, []
+
+    def flush():
+        if not batch:
+            return
+        try:
+            with span("index.upsert"):
+                index.upsert(list(batch))
+        except Exception as e:
+            summary["failed_upserts"] += len(batch)
+            print(f"⚠️ Upsert of {len(batch)} page(s) failed: {e}")
+        else:
+            state.pages.update(entries)
+            for status in statuses:
+                summary[status] += 1
+            summary["ids"].extend(record.id for record in batch)
+            if on_upsert:
+                on_upsert(list(batch))
+        batch.clear()
+        entries.clear()
+        statuses.clear()
+
+    for result in crawler.crawl():
+        if result.status not in ("new", "changed", "gone"):
+            summary[result.status] += 1
+        if result.status in ("new", "changed"):
+            batch.append(record_cls(
+                id=content_record_id(result.url, prefix="web"),
+                value=result.text,
+                value_type="text",
+                attributes={"url": result.url, "title": result.title, "source": result.url}
+            ))
+            entries[result.url] = result.entry
+            statuses.append(result.status)
+            print(f"🌐 {result.status:7} {result.url}")
+            if len(batch) >= batch_records:
+                flush()
+        elif result.status == "unchanged":
+            if result.entry:
+                state.pages[result.url] = result.entry
+        elif result.status == "gone":
+            try:
+                index.delete_record(content_record_id(result.url, prefix="web"))
+                state.pages.pop(result.url, None)
+                summary["gone"] += 1
+                if on_delete:
+                    on_delete(content_record_id(result.url, prefix="web"))
+            except Exception as e:
+                summary["failed_deletes"] += 1
+                print(f"⚠️ Could not delete {result.url}: {e}")
+        elif result.status == "error":
+            print(f"⚠️ {result.url}: {result.error}")
+
+    flush()
+    state.save()
+    return summary
+
+
+def format_summary(summary, seconds):
+    return (f"🕸 Crawl finished in {seconds:.2f}s: {summary['new']} new, {summary['changed']} changed, "
+            f"{summary['unchanged']} unchanged, {summary['gone']} removed, "
+            f"{summary['skipped']} skipped, {summary['error']} errors"
+            + (f", {summary['failed_upserts']} failed upserts" if summary["failed_upserts"] else "")
+            + (f", {summary['failed_deletes']} failed deletes" if summary["failed_deletes"] else ""))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+csv_chunker.py
+Stream a CSV into self-contained text chunks packed to a byte / token budget
+"""
+import csv
+import io
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+CSV_CHUNK_MAX_BYTES = 256 * 1024  # UTF-8 bytes per chunk, header included
+CSV_CHUNK_MAX_TOKENS = None       # e.g. 8_000; estimated as chars / CHARS_PER_TOKEN
+CHARS_PER_TOKEN = 4
+
+
+class CsvChunk:
+    def __init__(self, number, first_row, last_row, text):
+        self.number = number
+        self.first_row = first_row  # 1-based data rows, header excluded
+        self.last_row = last_row
+        self.text = text            # header line + rows, valid CSV on its own
+
+    @property
+    def rows(self):
+        return self.last_row - self.first_row + 1
+
+    @property
+    def label(self):
+        return (f"{self.number} (rows {self.first_row}-{self.last_row}, "
+                f"{len(self.text.encode('utf-8')) / 1024:.0f} KB)")
+
+
+class _LineFormatter:
+    """
+    Re-serialize parsed rows through one reusable buffer
+    """
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    def __call__(self, row):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(row)
+        return self._buffer.getvalue()
+
+
+def _utf8_len(text):
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+def iter_csv_chunks(path, max_bytes=CSV_CHUNK_MAX_BYTES, max_tokens=CSV_CHUNK_MAX_TOKENS,
+                    encoding="utf-8"):
+    """
+    Yield CsvChunk objects, packing rows until the next one would exceed
+    max_bytes or max_tokens. Every chunk repeats the header, so each one
+    stands alone for retrieval; a single row over budget becomes its own
+    chunk. Only the rows of the current chunk are held in memory.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN if max_tokens else None
+    line = _LineFormatter()
+
+    with open(path, newline="", encoding=encoding, errors="replace") as f:
+        reader = csv.reader(f)
+        header_row = next(reader, None)
+        if header_row is None:
+            return
+        header = line(header_row)
+        header_bytes, header_chars = _utf8_len(header), len(header)
+
+        number, first, last = 0, None, None
+        lines, size, chars = [], header_bytes, header_chars
+        for row_number, row in enumerate(reader, 1):
+            if not row:
+                continue
+            text = line(row)
+            row_bytes, row_chars = _utf8_len(text), len(text)
+
+            if lines and (size + row_bytes > max_bytes
+                          or (max_chars and chars + row_chars > max_chars)):
+                number += 1
+                yield CsvChunk(number, first, last, header + "".join(lines))
+                lines, size, chars = [], header_bytes, header_chars
+
+            if not lines:
+                first = row_number
+            last = row_number
+            lines.append(text)
+            size += row_bytes
+            chars += row_chars
+
+        if lines:
+            number += 1
+            yield CsvChunk(number, first, last, header + "".join(lines))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+http_cache.py
+Shared keep-alive HTTP session and on-disk response cache (TTL + ETag/Last-Modified)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from settings import CACHE_DIR
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+HTTP_CACHE_TTL = 3600  # seconds before a cached response is revalidated
+HTTP_POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Process-wide requests.Session with a pooled keep-alive adapter
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class CachedResponse:
+    def __init__(self, entry, from_cache):
+        self.url = entry["url"]
+        self.status_code = entry["status"]
+        self.text = entry["text"]
+        self.content_type = entry.get("content_type", "")
+        self.etag = entry.get("etag")
+        self.last_modified = entry.get("last_modified")
+        self.fetched_at = entry["fetched_at"]
+        self.from_cache = from_cache
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class HttpCache:
+    """
+    GET cache backed by memory and disk.
+
+    Fresh entries (younger than ttl) are served without any request.
+    Stale entries are revalidated with If-None-Match / If-Modified-Since,
+    so a 304 only refreshes the timestamp. If revalidation fails the stale
+    copy is returned instead of an error.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, ttl=HTTP_CACHE_TTL, session=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.session = session
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def _key(self, url, params):
+        raw = json.dumps([url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def _store(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+
+        # Created on first write, so importing a module that builds a cache
+        # does not leave directories behind
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._path(key))
+
+    def get(self, url, params=None, timeout=10, headers=None):
+        key = self._key(url, params)
+        entry = self._load(key)
+
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            return CachedResponse(entry, from_cache=True)
+
+        request_headers = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        import requests
+
+        session = self.session or get_session()
+        try:
+            response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                entry = dict(entry, fetched_at=time.time())
+                self._store(key, entry)
+                return CachedResponse(entry, from_cache=True)
+
+            response.raise_for_status()
+        except requests.RequestException:
+            if entry is not None:
+                return CachedResponse(entry, from_cache=True)
+            raise
+
+        entry = {
+            "url": response.url,
+            "status": response.status_code,
+            "text": response.text,
+            "content_type": response.headers.get("Content-Type", ""),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._store(key, entry)
+        return CachedResponse(entry, from_cache=False)
+
+    def get_json(self, url, params=None, timeout=10):
+        return self.get(url, params=params, timeout=timeout).json()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+index_catalog.py
+Process-wide cache of index metadata and live index handles
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from settings import CACHE_DIR
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+CATALOG_TTL = 300  # seconds before the index list / a handle is refreshed
+COUNT_GRACE = 600  # seconds a local upsert count beats a lower server count
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+class IndexEntry:
+    def __init__(self, id, name, description="", num_documents=None, counted_at=0.0):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.num_documents = num_documents  # None until known
+        self.counted_at = counted_at        # last local update of num_documents
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "num_documents": self.num_documents,
+            "counted_at": self.counted_at,
+        }
+
+
+class IndexCatalog:
+    """
+    Caches IndexFactory.list() metadata and IndexFactory.get() handles.
+
+    The metadata is persisted to disk so a fresh process can show the index
+    menu without a control-plane call; handles live for ttl seconds.
+    """
+
+    def __init__(self, factory, path, ttl=CATALOG_TTL):
+        self.factory = factory
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._listed_at = 0.0
+        self._handles = {}  # index_id -> (handle, fetched_at)
+        self._load()
+
+    # ---------- persistence ----------
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._listed_at = data.get("listed_at", 0.0)
+        for item in data.get("indexes", []):
+            self._entries[item["id"]] = IndexEntry(**item)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "listed_at": self._listed_at,
+            "indexes": [e.to_dict() for e in self._entries.values()],
+        }
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    # ---------- metadata ----------
+    def refresh(self):
+        results = self.factory.list()["results"]
+        with self._lock:
+            previous = self._entries
+            self._entries = {}
+            for idx in results:
+                entry = IndexEntry(idx.id, idx.name, getattr(idx, "description", "") or "")
+                if idx.id in previous:
+                    entry.num_documents = previous[idx.id].num_documents
+                    entry.counted_at = previous[idx.id].counted_at
+                self._entries[idx.id] = entry
+            self._listed_at = time.time()
+            self._save()
+
+    def list(self, prefix=""):
+        if time.time() - self._listed_at > self.ttl:
+            self.refresh()
+        with self._lock:
+            return [e for e in self._entries.values() if e.name.startswith(prefix)]
+
+    # ---------- handles ----------
+    def get(self, index_id):
+        with self._lock:
+            cached = self._handles.get(index_id)
+        if cached is not None and time.time() - cached[1] < self.ttl:
+            return cached[0]
+
+        handle = self.factory.get(index_id)
+        self.add(handle)
+        return handle
+
+    def add(self, handle):
+        """
+        Register a handle (e.g. a freshly created index)
+        """
+        with self._lock:
+            self._handles[handle.id] = (handle, time.time())
+            entry = self._entries.get(handle.id)
+            if entry is None:
+                entry = self._entries[handle.id] = IndexEntry(handle.id, handle.name)
+            entry.name = handle.name
+            entry.description = getattr(handle, "description", "") or ""
+            self._save()
+
+    # ---------- document counts ----------
+    def document_count(self, index_id):
+        """
+        Locally tracked number of documents, or None if never counted
+        """
+        with self._lock:
+            entry = self._entries.get(index_id)
+            return entry.num_documents if entry else None
+
+    def set_document_count(self, index_id, count):
+        with self._lock:
+            entry = self._entries.get(index_id)
+            if entry is None:
+                return
+            entry.num_documents = count
+            entry.counted_at = time.time()
+            self._save()
+
+    def record_upsert(self, index_id, added=1):
+        """
+        Count documents added by a successful upsert
+        """
+        with self._lock:
+            entry = self._entries.get(index_id)
+            if entry is None:
+                return
+            entry.num_documents = (entry.num_documents or 0) + added
+            entry.counted_at = time.time()
+            self._save()
+
+    def record_delete(self, index_id, removed=1):
+        with self._lock:
+            entry = self._entries.get(index_id)
+            if entry is None or entry.num_documents is None:
+                return
+            entry.num_documents = max(0, entry.num_documents - removed)
+            entry.counted_at = time.time()
+            self._save()
+
+    def reconcile(self, index_id):
+        """
+        Replace the local count with the server's count.
+        Right after a local upsert the server may still be indexing, so a
+        lower server count is ignored for COUNT_GRACE seconds.
+        """
+        handle = self.get(index_id)
+        if hasattr(handle, "count"):
+            server_count = int(handle.count())
+        else:
+            server_count = int(handle.info()["num_documents"])
+
+        with self._lock:
+            entry = self._entries.get(index_id)
+            if entry is None:
+                return
+            recent = time.time() - entry.counted_at < COUNT_GRACE
+            if recent and entry.num_documents is not None and entry.num_documents > server_count:
+                return
+            entry.num_documents = server_count
+            self._save()
+
+    def reconcile_async(self, index_id):
+        def run():
+            try:
+                self.reconcile(index_id)
+            except Exception as e:
+                print(f"⚠️ Failed to refresh document count: {e}")
+
+        thread = threading.Thread(target=run, name=f"reconcile-{index_id}", daemon=True)
+        thread.start()
+        return thread
+
+    def forget(self, index_id):
+        with self._lock:
+            self._handles.pop(index_id, None)
+            self._entries.pop(index_id, None)
+            self._save()
+
+
+def get_catalog(factory):
+    """
+    Shared catalog for a given index factory (one cache file per backend)
+    """
+    with _catalogs_lock:
+        key = id(factory)
+        if key not in _catalogs:
+            path = os.path.join(CACHE_DIR, f"catalog_{factory.__name__}.json")
+            _catalogs[key] = IndexCatalog(factory, path)
+        return _catalogs[key]
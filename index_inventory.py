@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+index_inventory.py
+Streaming, de-duplicated inventory of the sources stored in an index
+"""
+import json
+import os
+import tempfile
+
+from settings import CACHE_DIR
+from tracing import span
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+INVENTORY_DIR = os.path.join(CACHE_DIR, "inventory")
+INVENTORY_PAGE_SIZE = 500
+REMOTE_SAMPLE_SIZE = 1000  # remote indexes cannot page; one bounded sample
+
+
+def source_name(meta):
+    """
+    Prefer file-based sources
+    """
+    return (
+        meta.get("file_name")
+        or meta.get("source")
+        or meta.get("url")
+        or "unknown"
+    )
+
+
+def source_kind(name):
+    return os.path.splitext(name)[1].lower() if "." in name else "url"
+
+
+def iter_metadata_pages(index, page_size=INVENTORY_PAGE_SIZE, offset=0):
+    """
+    Yield (next_offset, [metadata, ...]) pages.
+
+    Backends with list_records (the local index) are paged natively and
+    only return metadata. The remote API has no listing call, so it gets a
+    single wildcard search sample and a warning if that looks truncated.
+    """
+    if hasattr(index, "list_records"):
+        while True:
+            page = index.list_records(offset=offset, limit=page_size, fields=("metadata",))
+            if not page:
+                return
+            offset += len(page)
+            yield offset, [r.get("metadata") or {} for r in page]
+            if len(page) < page_size:
+                return
+    else:
+        with span("index.search"):
+            resp = index.search("*", top_k=REMOTE_SAMPLE_SIZE)
+        results = getattr(resp, "data", None) or []
+        if len(results) >= REMOTE_SAMPLE_SIZE:
+            print(f"⚠️ Inventory sampled the first {REMOTE_SAMPLE_SIZE} chunks only.")
+        yield len(results), [r.get("metadata") or {} for r in results]
+
+
+def iter_index_sources(index, page_size=INVENTORY_PAGE_SIZE):
+    """
+    Yield (name, kind) for each source the first time it is seen.
+    Memory grows with the number of distinct sources, not chunks.
+    """
+    seen = set()
+    for _, metas in iter_metadata_pages(index, page_size):
+        for meta in metas:
+            name = source_name(meta)
+            if name not in seen:
+                seen.add(name)
+                yield name, source_kind(name)
+
+
+class InventoryFile:
+    """
+    Inventory persisted as JSONL (one source per line) plus a small state
+    file. For the local index the state holds the shard generation and the
+    shard numbers already scanned: refresh() only reads new shards while
+    the generation is unchanged, and rescans once rows were deleted,
+    replaced or compacted. Other backends are rescanned every time.
+    """
+
+    def __init__(self, index_id, directory=INVENTORY_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{index_id}.jsonl")
+        self.state_path = os.path.join(directory, f"{index_id}.state.json")
+
+    def _state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.state_path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.state_path)
+
+    def iter_sources(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _pending_pages(self, index, page_size):
+        """
+        (metadata pages to scan, new state, whether to start over)
+        """
+        if not hasattr(index, "shard_snapshot"):
+            return (metas for _, metas in iter_metadata_pages(index, page_size)), {}, True
+
+        state = self._state()
+        generation, shards = index.shard_snapshot()
+        rescan = state.get("generation") != generation
+        scanned = set() if rescan else set(state.get("shards", []))
+        pages = (index.list_shard_records(number, fields=("metadata",))
+                 for number in shards if number not in scanned)
+        metas = ([r.get("metadata") or {} for r in page] for page in pages)
+        return metas, {"generation": generation, "shards": shards}, rescan
+
+    def refresh(self, index, page_size=INVENTORY_PAGE_SIZE):
+        """
+        Scan what changed and append newly seen sources.
+        Returns the number of sources added.
+        """
+        pages, state, rescan = self._pending_pages(index, page_size)
+        if rescan and os.path.exists(self.path):
+            os.unlink(self.path)
+
+        seen = {item["name"] for item in self.iter_sources()}
+        added = 0
+        with open(self.path, "a", encoding="utf-8") as f:
+            for metas in pages:
+                for meta in metas:
+                    name = source_name(meta)
+                    if name not in seen:
+                        seen.add(name)
+                        f.write(json.dumps({"name": name, "kind": source_kind(name)}) + "\n")
+                        added += 1
+
+        self._write_state(state)
+        return added
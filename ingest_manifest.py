@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ingest_manifest.py
+Local SQLite manifest of records pushed to each index (delta upserts)
+"""
+import hashlib
+import os
+import sqlite3
+import time
+
+from settings import CACHE_DIR
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+MANIFEST_PATH = os.path.join(CACHE_DIR, "ingest_manifest.sqlite3")
+
+
+def content_record_id(value: str, prefix: str = "csv") -> str:
+    """
+    Stable record ID derived from the row content, not its position
+    """
+    digest = hashlib.sha256(value.rstrip("\r\n").encode("utf-8")).hexdigest()
+    return f"{prefix}_{digest[:32]}"
+
+
+class IngestManifest:
+    """
+    Tracks which record IDs of a dataset were pushed to which index.
+
+    Each ingest run tags the IDs it sees with a run id; anything left with an
+    older run id afterwards was removed from the dataset and can be deleted.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " index_id TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " record_id TEXT NOT NULL,"
+            " run_id INTEGER NOT NULL,"
+            " pushed INTEGER NOT NULL DEFAULT 0,"
+            " PRIMARY KEY (index_id, source, record_id))"
+        )
+        self.conn.commit()
+
+    def start_run(self) -> int:
+        return time.time_ns()
+
+    def mark_seen(self, index_id, source, record_id, run_id) -> bool:
+        """
+        Record that record_id is in the current dataset.
+        Returns True if it still has to be upserted.
+        """
+        row = self.conn.execute(
+            "SELECT run_id, pushed FROM records"
+            " WHERE index_id = ? AND source = ? AND record_id = ?",
+            (index_id, source, record_id)
+        ).fetchone()
+
+        if row is None:
+            self.conn.execute(
+                "INSERT INTO records (index_id, source, record_id, run_id, pushed)"
+                " VALUES (?, ?, ?, ?, 0)",
+                (index_id, source, record_id, run_id)
+            )
+            return True
+
+        seen_run, pushed = row
+        if seen_run == run_id:
+            # Duplicate row in the same file: already queued or pushed
+            return False
+
+        self.conn.execute(
+            "UPDATE records SET run_id = ?"
+            " WHERE index_id = ? AND source = ? AND record_id = ?",
+            (run_id, index_id, source, record_id)
+        )
+        return not pushed
+
+    def mark_pushed(self, index_id, source, record_ids):
+        self.conn.executemany(
+            "UPDATE records SET pushed = 1"
+            " WHERE index_id = ? AND source = ? AND record_id = ?",
+            [(index_id, source, rid) for rid in record_ids]
+        )
+        self.conn.commit()
+
+    def stale_ids(self, index_id, source, run_id):
+        """
+        (record_id, pushed) pairs from earlier runs the current run did not see
+        """
+        return [
+            (record_id, bool(pushed))
+            for record_id, pushed in self.conn.execute(
+                "SELECT record_id, pushed FROM records"
+                " WHERE index_id = ? AND source = ? AND run_id != ?",
+                (index_id, source, run_id)
+            )
+        ]
+
+    def forget(self, index_id, source, record_ids):
+        self.conn.executemany(
+            "DELETE FROM records"
+            " WHERE index_id = ? AND source = ? AND record_id = ?",
+            [(index_id, source, rid) for rid in record_ids]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+ingest_verifier.py
+Background check that freshly upserted documents became searchable
+"""
+import threading
+import time
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+VERIFY_INITIAL_DELAY = 1.0   # seconds before the first readiness poll
+VERIFY_BACKOFF = 2.0
+VERIFY_MAX_DELAY = 30.0
+VERIFY_TIMEOUT = 15 * 60     # give up after this many seconds
+
+
+def is_searchable(index, doc_id):
+    """
+    True once the index returns the record for doc_id
+    """
+    try:
+        resp = index.get_record(doc_id)
+    except Exception:
+        return False
+    if getattr(resp, "status", "SUCCESS") != "SUCCESS":
+        return False
+    return bool(getattr(resp, "data", None))
+
+
+def wait_until_searchable(index, doc_ids, initial_delay=VERIFY_INITIAL_DELAY,
+                          backoff=VERIFY_BACKOFF, max_delay=VERIFY_MAX_DELAY,
+                          timeout=VERIFY_TIMEOUT):
+    """
+    Poll with exponential backoff until every doc is searchable.
+    Returns {doc_id: seconds_to_searchable or None if it timed out}.
+    """
+    started = time.perf_counter()
+    pending = list(doc_ids)
+    ready = {doc_id: None for doc_id in pending}
+    delay = initial_delay
+
+    while pending and time.perf_counter() - started < timeout:
+        time.sleep(delay)
+        still_pending = []
+        for doc_id in pending:
+            if is_searchable(index, doc_id):
+                ready[doc_id] = time.perf_counter() - started
+            else:
+                still_pending.append(doc_id)
+        pending = still_pending
+        delay = min(delay * backoff, max_delay)
+
+    return ready
+
+
+def verify_async(index, doc_ids, on_done=None, **kwargs):
+    """
+    Run wait_until_searchable in a daemon thread and report the result.
+    The ingest call returns immediately; on_done(ready) runs afterwards.
+    """
+    def run():
+        ready = wait_until_searchable(index, doc_ids, **kwargs)
+        for doc_id, seconds in ready.items():
+            if seconds is None:
+                print(f"\n⚠️ Document {doc_id} not searchable yet (gave up waiting).")
+            else:
+                print(f"\n🔎 Document {doc_id} searchable after {seconds:.1f}s.")
+        if on_done:
+            try:
+                on_done(ready)
+            except Exception as e:
+                print(f"⚠️ Post-verification step failed: {e}")
+
+    thread = threading.Thread(target=run, name="ingest-verifier", daemon=True)
+    thread.start()
+    return thread
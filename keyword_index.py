@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+keyword_index.py
+Local BM25 inverted index per index, built as a side effect of ingestion
+"""
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+
+from csv_chunker import CSV_CHUNK_MAX_BYTES, CSV_CHUNK_MAX_TOKENS
+from settings import CACHE_DIR
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+KEYWORD_DIR = os.path.join(CACHE_DIR, "keyword")
+KEYWORD_TOP_K = 8
+BM25_K1 = 1.2
+BM25_B = 0.75
+COMMON_TERM_DF = 0.1  # terms in more docs than this fraction only rescore existing candidates
+
+# Keeps section numbers, CFR citations and EO numbers whole: "164.312", "16-cfr"
+_TOKEN = re.compile(r"[a-z0-9§]+(?:[.\-][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the to was were "
+    "will with this these those which what who how does do under".split()
+)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def tokenize(text):
+    return [t.strip("§") for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS and t.strip("§")]
+
+
+class KeywordDoc:
+    def __init__(self, id, value, value_type="text", attributes=None):
+        self.id = id
+        self.value = value
+        self.value_type = value_type
+        self.attributes = attributes or {}
+
+
+class KeywordIndex:
+    """
+    BM25 over one SQLite file. Terms are interned to integer IDs and postings
+    are stored as (term, doc, tf, doc length) in a clustered WITHOUT ROWID
+    table, so a query reads only the postings of its own terms. Document
+    text is kept zlib-compressed for building answer context.
+
+    Records are stored as passages split like the vector upsert split them,
+    with the same "<record id>_<n>" chunk IDs as local_index, so a passage
+    found by both searches fuses into one hit.
+    """
+
+    def __init__(self, index_id, path=None):
+        self.index_id = index_id
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", index_id)
+        self.path = path or os.path.join(KEYWORD_DIR, f"{safe}.sqlite3")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS terms ("
+            " id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL, df INTEGER NOT NULL DEFAULT 0);"
+            "CREATE TABLE IF NOT EXISTS docs ("
+            " num INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, document TEXT NOT NULL,"
+            " length INTEGER NOT NULL, tids BLOB NOT NULL, body BLOB NOT NULL, metadata TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS docs_document ON docs (document);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " tid INTEGER NOT NULL, doc INTEGER NOT NULL, tf INTEGER NOT NULL, dl INTEGER NOT NULL,"
+            " PRIMARY KEY (tid, doc)) WITHOUT ROWID;"
+        )
+        self.conn.commit()
+        self._docs, self._total_length = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs"
+        ).fetchone()
+
+    # ---------- writes ----------
+    def _term_ids(self, terms):
+        ids = {}
+        for term in terms:
+            row = self.conn.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()
+            if row is None:
+                ids[term] = self.conn.execute("INSERT INTO terms (term) VALUES (?)", (term,)).lastrowid
+            else:
+                ids[term] = row[0]
+        return ids
+
+    def _delete(self, record_id):
+        """
+        Remove every passage of a record; returns how many there were
+        """
+        rows = self.conn.execute(
+            "SELECT num, length, tids FROM docs WHERE document = ?", (record_id,)).fetchall()
+        for num, length, tids in rows:
+            tids = array("I", tids)
+            self.conn.executemany("DELETE FROM postings WHERE tid = ? AND doc = ?", [(tid, num) for tid in tids])
+            self.conn.executemany("UPDATE terms SET df = df - 1 WHERE id = ?", [(tid,) for tid in tids])
+            self.conn.execute("DELETE FROM docs WHERE num = ?", (num,))
+            self._docs -= 1
+            self._total_length -= length
+        return len(rows)
+
+    def add(self, records, splitter=None):
+        """
+        Index (or re-index) records with .id, .value and .attributes, split
+        with the splitter their vector upsert used (None: one passage each)
+        """
+        if splitter is not None:
+            from local_index import split_value
+        with self._lock:
+            for record in records:
+                # Re-indexing replaces the record's old passages, even when its new text has no terms
+                self._delete(record.id)
+                text = record.value if isinstance(record.value, str) else str(record.value)
+                passages = split_value(text, splitter) if splitter is not None else [text]
+                for n, passage in enumerate(passages):
+                    self._insert(f"{record.id}_{n}", record, passage)
+            self.conn.commit()
+
+    def _insert(self, passage_id, record, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        tids = self._term_ids(counts)
+        num = self.conn.execute(
+            "INSERT INTO docs (id, document, length, tids, body, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+            (passage_id, record.id, len(tokens), array("I", tids.values()).tobytes(),
+             zlib.compress(text.encode("utf-8")),
+             json.dumps(getattr(record, "attributes", None) or {}, default=str))
+        ).lastrowid
+        self.conn.executemany(
+            "INSERT INTO postings (tid, doc, tf, dl) VALUES (?, ?, ?, ?)",
+            [(tids[term], num, tf, len(tokens)) for term, tf in counts.items()]
+        )
+        self.conn.executemany("UPDATE terms SET df = df + 1 WHERE id = ?",
+                              [(tid,) for tid in tids.values()])
+        self._docs += 1
+        self._total_length += len(tokens)
+
+    def delete(self, record_ids):
+        with self._lock:
+            removed = sum(1 for record_id in record_ids if self._delete(record_id))
+            self.conn.commit()
+        return removed
+
+    # ---------- reads ----------
+    def count(self):
+        return self._docs
+
+    def search(self, query, top_k=KEYWORD_TOP_K, k1=BM25_K1, b=BM25_B):
+        """
+        BM25 top-k as hit dicts (same shape as retrieval.normalize_hits)
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._docs:
+            return []
+
+        with self._lock:
+            n_docs, avgdl = self._docs, self._total_length / self._docs
+            marks = ",".join("?" * len(terms))
+            rows = self.conn.execute(
+                f"SELECT id, df FROM terms WHERE term IN ({marks}) AND df > 0 ORDER BY df",
+                tuple(terms)).fetchall()
+
+            # Rarest terms first; once they found candidates, very common
+            # terms only add to those instead of scanning their whole postings
+            scores = {}
+            for tid, df in rows:
+                if scores and df > COMMON_TERM_DF * n_docs and len(scores) * 4 < df:
+                    postings = self._postings_for(tid, list(scores))
+                else:
+                    postings = self.conn.execute(
+                        "SELECT doc, tf, dl FROM postings WHERE tid = ?", (tid,)).fetchall()
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc, tf, dl in postings:
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (
+                        tf + k1 * (1 - b + b * dl / avgdl))
+
+            top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            if not top:
+                return []
+            rows = {num: (passage_id, document, body, metadata)
+                    for num, passage_id, document, body, metadata in self.conn.execute(
+                f"SELECT num, id, document, body, metadata FROM docs WHERE num IN ({','.join('?' * len(top))})",
+                tuple(num for num, _ in top))}
+
+        hits = []
+        for num, score in top:
+            passage_id, document, body, metadata = rows[num]
+            hits.append({
+                "key": f"{self.index_id}:{passage_id}",
+                "index_id": self.index_id,
+                "index_name": "",
+                "id": passage_id,
+                "document": document,
+                "data": zlib.decompress(body).decode("utf-8"),
+                "score": round(score, 4),
+                "metadata": json.loads(metadata),
+            })
+        return hits
+
+    def _postings_for(self, tid, docs):
+        postings = []
+        for start in range(0, len(docs), 500):
+            chunk = docs[start:start + 500]
+            postings.extend(self.conn.execute(
+                f"SELECT doc, tf, dl FROM postings WHERE tid = ? AND doc IN ({','.join('?' * len(chunk))})",
+                (tid, *chunk)))
+        return postings
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_keyword_index(index_id):
+    """
+    One KeywordIndex per index ID for the whole process
+    """
+    with _indexes_lock:
+        if index_id not in _indexes:
+            _indexes[index_id] = KeywordIndex(index_id)
+        return _indexes[index_id]
+
+
+def keyword_search(index_id, query, top_k=KEYWORD_TOP_K):
+    return get_keyword_index(index_id).search(query, top_k)
+
+
+def iter_file_docs(path, csv_max_bytes=CSV_CHUNK_MAX_BYTES, csv_max_tokens=CSV_CHUNK_MAX_TOKENS):
+    """
+    Local text of an ingested file, in passages: PDF pages, CSV chunks or
+    the whole file for anything else. CSV chunks take the budget and the
+    record IDs of policy_navigator's chunked CSV upload, so pass the budget
+    that upload used.
+    """
+    name = os.path.basename(path)
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".pdf":
+        from pdf_text import iter_page_records
+        yield from iter_page_records(path, KeywordDoc)
+    elif ext == ".csv":
+        from csv_chunker import iter_csv_chunks
+        doc_id = "csv_" + os.path.splitext(name)[0]
+        for chunk in iter_csv_chunks(path, csv_max_bytes, csv_max_tokens):
+            yield KeywordDoc(f"{doc_id}_rows_{chunk.first_row}-{chunk.last_row}", chunk.text,
+                             attributes={"source": name, "file_name": name,
+                                         "first_row": chunk.first_row, "last_row": chunk.last_row})
+    else:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            yield KeywordDoc(name, f.read(), attributes={"file_name": name})
+
+
+def index_file_async(index_id, path, **chunking):
+    """
+    Extract and index a file's text in the background (chunking: see
+    iter_file_docs). Non-daemon, so a CLI that exits right after ingesting
+    still finishes the keyword index.
+    """
+    thread = threading.Thread(target=_index_safely, args=(index_id, path, chunking),
+                              name="keyword-index")
+    thread.start()
+    return thread
+
+
+def _index_safely(index_id, path, chunking):
+    try:
+        batch = []
+        keyword_index = get_keyword_index(index_id)
+        for record in iter_file_docs(path, **chunking):
+            batch.append(record)
+            if len(batch) >= 500:
+                keyword_index.add(batch)
+                batch = []
+        keyword_index.add(batch)
+    except Exception as e:
+        print(f"⚠️ Keyword index update failed for {index_id}: {e}")
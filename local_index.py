@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+local_index.py
+Offline vector index with the same upsert/search/info surface as aiXplain indexes.
+
+Embeddings live in append-only NumPy .npy shards (memory-mapped for search,
+optional float16) and are produced by a local sentence-transformers model. Select it
+in either script with POLICY_NAVIGATOR_INDEX_BACKEND=local.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+
+import numpy as np
+
+from settings import CACHE_DIR
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+LOCAL_INDEX_DIR = os.path.join(CACHE_DIR, "indexes")
+LOCAL_EMBEDDING_MODEL = os.getenv("POLICY_NAVIGATOR_LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+LOCAL_INDEX_DTYPE = "float32"  # or "float16" to halve embedding storage
+LOCAL_INDEX_MAX_SHARDS = 64     # upserts appended before the shards are merged
+LOCAL_COMPACT_MIN_DEAD = 1000   # replaced/deleted rows tolerated regardless of index size
+LOCAL_SEARCH_BLOCK_ROWS = 16384 # embedding rows converted to float32 at a time
+ENCODE_BATCH_SIZE = 64
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(model_name=LOCAL_EMBEDDING_MODEL):
+    """
+    Load (once per process) a sentence-transformers model
+    """
+    with _encoders_lock:
+        if model_name not in _encoders:
+            from sentence_transformers import SentenceTransformer
+            _encoders[model_name] = SentenceTransformer(model_name, device="cpu")
+        return _encoders[model_name]
+
+
+def embed(texts, model_name=LOCAL_EMBEDDING_MODEL):
+    """
+    L2-normalised float32 embeddings, one row per text
+    """
+    vectors = get_encoder(model_name).encode(
+        list(texts),
+        batch_size=ENCODE_BATCH_SIZE,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class LocalRecord:
+    def __init__(self, id, value, value_type="text", attributes=None):
+        self.id = id
+        self.value = value
+        self.value_type = value_type
+        self.attributes = attributes or {}
+
+
+class LocalSplitter:
+    """Stand-in for the SDK's Splitter; split_by is a plain string such as "line"."""
+
+    def __init__(self, split=False, split_by="word", split_length=100, split_overlap=0):
+        self.split = split
+        self.split_by = split_by
+        self.split_length = split_length
+        self.split_overlap = split_overlap
+
+
+class LocalResponse:
+    def __init__(self, data, status="SUCCESS"):
+        self.data = data
+        self.status = status
+
+
+def _read_text(path):
+    if path.lower().endswith(".pdf"):
+        import fitz  # PyMuPDF
+
+        with fitz.open(path) as doc:
+            return "\n".join(page.get_text() for page in doc)
+
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def split_value(value, splitter):
+    """
+    Approximate the server-side Splitter: group units into windows of
+    split_length with split_overlap units shared between windows.
+    """
+    if splitter is None or not getattr(splitter, "split", False):
+        return [value]
+
+    mode = str(getattr(splitter.split_by, "value", splitter.split_by)).lower()
+    if mode == "line":
+        units, sep = value.splitlines(), "\n"
+    elif mode == "sentence":
+        units, sep = re.split(r"(?<=[.!?])\s+", value), " "
+    elif mode in ("passage", "page"):
+        units, sep = re.split(r"\n\s*\n", value), "\n\n"
+    else:
+        units, sep = value.split(), " "
+
+    length = max(1, int(getattr(splitter, "split_length", 100)))
+    step = max(1, length - int(getattr(splitter, "split_overlap", 0)))
+    chunks = [sep.join(units[i:i + length]) for i in range(0, len(units), step)]
+    return [c for c in chunks if c.strip()] or [value]
+
+
+class LocalIndex:
+    """
+    One index directory: meta.json plus append-only shards.
+
+    Every upsert writes one new shard (shard-<n>.npy rows lining up with
+    shard-<n>.json chunks) and never rewrites the existing ones. A document's
+    rows in its newest shard are the live ones; deletes are appended to
+    tombstones.jsonl. Shards are merged once dead rows outnumber live ones
+    or there are more than LOCAL_INDEX_MAX_SHARDS of them. Searches read
+    the shards memory-mapped, LOCAL_SEARCH_BLOCK_ROWS rows at a time.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.id = meta["id"]
+        self.name = meta["name"]
+        self.description = meta.get("description", "")
+        self.embedding_model = meta.get("embedding_model", LOCAL_EMBEDDING_MODEL)
+        self.dtype = meta.get("dtype", LOCAL_INDEX_DTYPE)
+        self._shards = None     # [(number, records, memory-mapped matrix)]
+        self._alive = None      # one bool array per shard
+        self._positions = None  # document_id -> [(shard position, row)] of live rows
+        self._dead = 0
+        self._live_records = None
+        self._all_records = None
+
+    # ---------- storage ----------
+    def _shard_path(self, number, ext):
+        return os.path.join(self.directory, f"shard-{number:06d}.{ext}")
+
+    def _tombstones_path(self):
+        return os.path.join(self.directory, "tombstones.jsonl")
+
+    def _shard_files(self):
+        """
+        (number, records path, matrix path) of every complete shard, oldest first
+        """
+        shards = []
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"shard-(\d+)\.json", name)
+            if match:
+                number = int(match.group(1))
+                shards.append((number, self._shard_path(number, "json"), self._shard_path(number, "npy")))
+        return sorted(shards)
+
+    def _load(self):
+        if self._shards is not None:
+            return
+        shards = []
+        for number, records_path, matrix_path in self._shard_files():
+            with open(records_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            if records:
+                shards.append((number, records, np.load(matrix_path, mmap_mode="r")))
+
+        deleted = {}
+        try:
+            with open(self._tombstones_path(), "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        deleted[entry["document_id"]] = max(entry["shard"], deleted.get(entry["document_id"], -1))
+        except FileNotFoundError:
+            pass
+
+        latest = {}
+        for number, records, _ in shards:
+            for r in records:
+                latest[r["document_id"]] = number
+
+        self._shards, self._alive, self._positions, self._dead = [], [], {}, 0
+        for number, records, matrix in shards:
+            alive = np.array([latest[r["document_id"]] == number and number > deleted.get(r["document_id"], -1)
+                              for r in records], dtype=bool)
+            self._add_shard(number, records, matrix, alive)
+
+    def _add_shard(self, number, records, matrix, alive=None):
+        position = len(self._shards)
+        if alive is None:
+            alive = np.ones(len(records), dtype=bool)
+        self._shards.append((number, records, matrix))
+        self._alive.append(alive)
+        for row, r in enumerate(records):
+            if alive[row]:
+                self._positions.setdefault(r["document_id"], []).append((position, row))
+        self._dead += int(len(records) - alive.sum())
+        self._live_records = None
+        self._all_records = None
+
+    def _kill(self, document_id):
+        positions = self._positions.pop(document_id, [])
+        for position, row in positions:
+            self._alive[position][row] = False
+        self._dead += len(positions)
+        self._live_records = None
+        return len(positions)
+
+    def _next_number(self):
+        return self._shards[-1][0] + 1 if self._shards else 1
+
+    def _write_shard(self, number, records, matrix):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".npy")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, matrix.astype(self.dtype, copy=False))
+        os.replace(tmp, self._shard_path(number, "npy"))
+
+        # The .json file is written last: a shard without it is ignored
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(records, f)
+        os.replace(tmp, self._shard_path(number, "json"))
+        return np.load(self._shard_path(number, "npy"), mmap_mode="r")
+
+    def _live_rows(self):
+        if self._live_records is None:
+            self._live_records = [r for (_, records, _), alive in zip(self._shards, self._alive)
+                                  for r, a in zip(records, alive) if a]
+        return self._live_records
+
+    def _all_rows(self):
+        if self._all_records is None:
+            self._all_records = [r for _, records, _ in self._shards for r in records]
+        return self._all_records
+
+    def _maybe_compact(self):
+        live = sum(len(alive) for alive in self._alive) - self._dead
+        if self._dead > max(live, LOCAL_COMPACT_MIN_DEAD) or len(self._shards) > LOCAL_INDEX_MAX_SHARDS:
+            self._compact()
+
+    def _compact(self):
+        """
+        Merge the live rows of all shards into one new shard, copying the
+        matrices block by block in the stored dtype
+        """
+        records = self._live_rows()
+        old = self._shard_files()
+        number = self._next_number()
+        if records:
+            dim = self._shards[0][2].shape[1]
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".npy")
+            os.close(fd)
+            out = np.lib.format.open_memmap(tmp, mode="w+", dtype=self.dtype, shape=(len(records), dim))
+            row = 0
+            for (_, _, matrix), alive in zip(self._shards, self._alive):
+                for start in range(0, len(alive), LOCAL_SEARCH_BLOCK_ROWS):
+                    block = matrix[start:start + LOCAL_SEARCH_BLOCK_ROWS][alive[start:start + LOCAL_SEARCH_BLOCK_ROWS]]
+                    out[row:row + len(block)] = block
+                    row += len(block)
+            out.flush()
+            del out
+            os.replace(tmp, self._shard_path(number, "npy"))
+
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            os.replace(tmp, self._shard_path(number, "json"))
+
+        # Everything older is now superseded; records files go first so a
+        # crash never leaves a shard without its matrix
+        for _, records_path, matrix_path in old:
+            os.remove(records_path)
+            if os.path.exists(matrix_path):
+                os.remove(matrix_path)
+        if os.path.exists(self._tombstones_path()):
+            os.remove(self._tombstones_path())
+
+        self._shards, self._alive, self._positions, self._dead = [], [], {}, 0
+        self._live_records = self._all_records = None
+        if records:
+            self._add_shard(number, records, np.load(self._shard_path(number, "npy"), mmap_mode="r"))
+
+    # ---------- aiXplain-compatible surface ----------
+    def prepare_record_from_file(self, file_path, file_id=None):
+        return LocalRecord(
+            id=file_id or os.path.basename(file_path),
+            value=_read_text(file_path),
+            attributes={"file_name": os.path.basename(file_path)}
+        )
+
+    def upsert(self, documents, splitter=None):
+        if isinstance(documents, str):
+            if os.path.exists(documents):
+                documents = [self.prepare_record_from_file(documents)]
+            else:
+                documents = [LocalRecord(id=documents, value=documents, attributes={"url": documents})]
+
+        chunks = []
+        for doc in documents:
+            for n, text in enumerate(split_value(doc.value, splitter)):
+                chunks.append({
+                    "id": f"{doc.id}_{n}",
+                    "document_id": doc.id,
+                    "value": text,
+                    "metadata": dict(doc.attributes or {})
+                })
+
+        new_matrix = embed([c["value"] for c in chunks], self.embedding_model) if chunks else None
+
+        with self._lock:
+            self._load()
+            for doc in documents:
+                self._kill(doc.id)
+            if chunks:
+                number = self._next_number()
+                self._add_shard(number, chunks, self._write_shard(number, chunks, new_matrix))
+            self._maybe_compact()
+
+        return LocalResponse([{"document_id": doc.id} for doc in documents])
+
+    def _scores(self, q):
+        """
+        Query scores against every stored row (dead rows -inf), reading the
+        memory-mapped shards in blocks so only one block is ever held as
+        float32
+        """
+        parts = []
+        for (_, _, matrix), alive in zip(self._shards, self._alive):
+            for start in range(0, len(alive), LOCAL_SEARCH_BLOCK_ROWS):
+                block = np.asarray(matrix[start:start + LOCAL_SEARCH_BLOCK_ROWS], dtype=np.float32)
+                scores = q @ block.T
+                parts.append(np.where(alive[start:start + LOCAL_SEARCH_BLOCK_ROWS], scores, -np.inf))
+        return np.hstack(parts) if parts else np.zeros((len(q), 0), dtype=np.float32)
+
+    def search_many(self, queries, top_k=10, filters=None):
+        """
+        Answer several queries with one pass over the embeddings
+        """
+        with self._lock:
+            self._load()
+            empty = not self._positions
+        if empty:
+            return [LocalResponse([]) for _ in queries]
+
+        q = embed(queries, self.embedding_model)
+        with self._lock:
+            scores = self._scores(q)
+            records = self._all_rows()
+        if not records:
+            return [LocalResponse([]) for _ in queries]
+
+        if filters:
+            # Accept {field: value} or aiXplain IndexFilter objects (equality only)
+            if not isinstance(filters, dict):
+                filters = {f.field: f.value for f in filters}
+            allowed = np.array([
+                all(r["metadata"].get(k) == v for k, v in filters.items()) for r in records
+            ])
+            scores = np.where(allowed, scores, -np.inf)
+
+        k = min(top_k, len(records))
+        responses = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            responses.append(LocalResponse([
+                {
+                    "id": records[i]["id"],
+                    "document": records[i]["document_id"],
+                    "score": float(row[i]),
+                    "data": records[i]["value"],
+                    "metadata": records[i]["metadata"],
+                }
+                for i in top if np.isfinite(row[i])
+            ]))
+        return responses
+
+    def search(self, query, top_k=10, filters=None):
+        return self.search_many([query], top_k=top_k, filters=filters)[0]
+
+    def list_records(self, offset=0, limit=100, fields=None):
+        """
+        One page of live chunks in storage order; fields limits the returned keys
+        """
+        with self._lock:
+            self._load()
+            page = self._live_rows()[offset:offset + limit]
+        if fields:
+            return [{k: r[k] for k in fields if k in r} for r in page]
+        return list(page)
+
+    def shard_snapshot(self):
+        """
+        (generation, shard numbers). Shards are append-only and the
+        generation changes whenever a stored row dies (delete, replacement
+        or compaction), so a reader that saw the same generation only needs
+        the shards it has not scanned yet.
+        """
+        with self._lock:
+            self._load()
+            first = self._shards[0][0] if self._shards else 0
+            return [first, self._dead], [number for number, _, _ in self._shards]
+
+    def list_shard_records(self, number, fields=None):
+        """
+        Live chunks of one shard; fields limits the returned keys
+        """
+        with self._lock:
+            self._load()
+            rows = [r for (n, records, _), alive in zip(self._shards, self._alive) if n == number
+                    for r, a in zip(records, alive) if a]
+        if fields:
+            return [{k: r[k] for k in fields if k in r} for r in rows]
+        return rows
+
+    def count(self):
+        with self._lock:
+            self._load()
+            return len(self._positions)
+
+    def info(self):
+        with self._lock:
+            self._load()
+            num_chunks = len(self._live_rows())
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "embedding_model": self.embedding_model,
+            "num_documents": self.count(),
+            "num_chunks": num_chunks,
+        }
+
+    def get_record(self, record_id):
+        with self._lock:
+            self._load()
+            chunks = [self._shards[position][1][row] for position, row in self._positions.get(record_id, [])]
+        return LocalResponse(chunks)
+
+    def delete_record(self, record_id):
+        with self._lock:
+            self._load()
+            if not self._kill(record_id):
+                return LocalResponse([])
+            with open(self._tombstones_path(), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"document_id": record_id, "shard": self._shards[-1][0]}) + "\n")
+            self._maybe_compact()
+        return LocalResponse([{"document_id": record_id}])
+
+
+class LocalIndexFactory:
+    """
+    Drop-in for the IndexFactory.get/create/list calls used by both scripts.
+    get() of an unknown ID creates an empty index under that ID, so the
+    placeholder index IDs in rag_agent work offline.
+    """
+
+    root = LOCAL_INDEX_DIR
+
+    @classmethod
+    def create(cls, name, description="", embedding_model=None, dtype=LOCAL_INDEX_DTYPE, index_id=None):
+        index_id = index_id or uuid.uuid4().hex
+        directory = os.path.join(cls.root, index_id)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "id": index_id,
+                "name": name,
+                "description": description,
+                # aiXplain model IDs cannot be loaded locally; keep the local model
+                "embedding_model": LOCAL_EMBEDDING_MODEL,
+                "remote_embedding_model": embedding_model,
+                "dtype": dtype,
+            }, f)
+        return LocalIndex(directory)
+
+    @classmethod
+    def get(cls, index_id):
+        directory = os.path.join(cls.root, index_id)
+        if not os.path.exists(os.path.join(directory, "meta.json")):
+            return cls.create(name=index_id, index_id=index_id)
+        return LocalIndex(directory)
+
+    @classmethod
+    def list(cls, **kwargs):
+        results = []
+        if os.path.isdir(cls.root):
+            for entry in sorted(os.listdir(cls.root)):
+                if os.path.exists(os.path.join(cls.root, entry, "meta.json")):
+                    results.append(LocalIndex(os.path.join(cls.root, entry)))
+        return {"results": results, "page_total": len(results), "total": len(results)}
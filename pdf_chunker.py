@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+pdf_chunker.py
+Split a PDF into in-memory chunks packed to a byte / token budget
+"""
+import io
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+PDF_CHUNK_MAX_BYTES = 4 * 1024 * 1024  # estimated serialized size per chunk
+PDF_CHUNK_MAX_TOKENS = None            # e.g. 50_000; needs per-page text extraction
+PDF_CHUNK_MAX_PAGES = 50
+CHARS_PER_TOKEN = 4
+
+
+class PdfChunk:
+    def __init__(self, number, first_page, last_page, buffer):
+        self.number = number
+        self.first_page = first_page
+        self.last_page = last_page
+        self.buffer = buffer  # BytesIO; .name carries the file name
+
+    @property
+    def size(self):
+        return self.buffer.getbuffer().nbytes
+
+    @property
+    def label(self):
+        return (f"{self.number} (pages {self.first_page}-{self.last_page}, "
+                f"{self.size / 1024:.0f} KB)")
+
+
+def _stream_length(obj):
+    obj = obj.get_object()
+    # pypdf keeps the stream bytes as they will be written (encoded or not)
+    # and drops /Length on read, so measure the data itself
+    data = getattr(obj, "_data", None)
+    if data is not None:
+        return len(data)
+    length = obj.get("/Length", 0) if hasattr(obj, "get") else 0
+    return int(length.get_object() if hasattr(length, "get_object") else length)
+
+
+def _refs(value):
+    value = value.get_object() if hasattr(value, "get_object") else value
+    if isinstance(value, list):
+        return value
+    return [value] if value is not None else []
+
+
+def page_costs(page):
+    """
+    Estimated bytes for one page: (own content-stream bytes, {object id: bytes}
+    for shared resources such as images and embedded fonts). Shared objects
+    are written once per chunk, so they are only counted once per chunk.
+    """
+    own = sum(_stream_length(ref) for ref in _refs(page.get("/Contents")))
+
+    shared = {}
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else {}
+
+    xobjects = resources.get("/XObject")
+    for ref in (xobjects.get_object().values() if xobjects is not None else []):
+        shared[getattr(ref, "idnum", id(ref))] = _stream_length(ref)
+
+    fonts = resources.get("/Font")
+    for ref in (fonts.get_object().values() if fonts is not None else []):
+        descriptor = ref.get_object().get("/FontDescriptor")
+        if descriptor is None:
+            continue
+        for key in ("/FontFile", "/FontFile2", "/FontFile3"):
+            font_file = descriptor.get_object().get(key)
+            if font_file is not None:
+                shared[getattr(font_file, "idnum", id(font_file))] = _stream_length(font_file)
+    return own, shared
+
+
+def page_tokens(page):
+    return len(page.extract_text() or "") // CHARS_PER_TOKEN
+
+
+def _build_chunk(reader, number, first, last, name):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for page in reader.pages[first - 1:last]:
+        writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    buffer.name = f"{name}_pages_{first}-{last}.pdf"
+    return PdfChunk(number, first, last, buffer)
+
+
+def iter_pdf_chunks(reader, max_bytes=PDF_CHUNK_MAX_BYTES, max_tokens=PDF_CHUNK_MAX_TOKENS,
+                    max_pages=PDF_CHUNK_MAX_PAGES, name="chunk"):
+    """
+    Yield PdfChunk objects, packing consecutive pages until the next page
+    would exceed max_bytes, max_tokens or max_pages. A single page over
+    budget becomes its own chunk. Each chunk is serialized into a BytesIO
+    only when it is complete, so at most one chunk is built at a time.
+    """
+    number, first = 0, None
+    size, tokens, seen = 0, 0, set()
+
+    for page_number, page in enumerate(reader.pages, 1):
+        own, shared = page_costs(page)
+        cost = own + sum(n for ref, n in shared.items() if ref not in seen)
+        page_tok = page_tokens(page) if max_tokens else 0
+
+        if first is not None and (
+            size + cost > max_bytes
+            or (max_tokens and tokens + page_tok > max_tokens)
+            or page_number - first >= max_pages
+        ):
+            number += 1
+            yield _build_chunk(reader, number, first, page_number - 1, name)
+            first, size, tokens, seen = None, 0, 0, set()
+            cost = own + sum(shared.values())
+
+        if first is None:
+            first = page_number
+        size += cost
+        tokens += page_tok
+        seen.update(shared)
+
+    if first is not None:
+        number += 1
+        yield _build_chunk(reader, number, first, len(reader.pages), name)
@@ -1,12 +1,6 @@
 #!/usr/bin/env python3
 
-from aixplain.factories import FileFactory
 import os
-from aixplain.factories import (
-    AgentFactory,
-    IndexFactory,
-    FileFactory
-)
 import logging
 
 logging.getLogger("aixplain").setLevel(logging.WARNING)
@@ -20,7 +14,56 @@ AGENT_NAME = "Policy Navigator"
 
 EMBEDDING_MODEL_ID = "678a4f8547f687504744960a"  # Snowflake Arctic
 
-from aixplain.factories.tool_factory import ToolFactory
+# "aixplain" (remote indexes) or "local" (offline local_index backend)
+INDEX_BACKEND = os.getenv("POLICY_NAVIGATOR_INDEX_BACKEND", "aixplain")
+
+
+def index_factory():
+    """
+    Index factory for the configured backend, imported on first use so the
+    menu comes up without loading the aixplain SDK
+    """
+    if INDEX_BACKEND == "local":
+        from local_index import LocalIndexFactory
+        return LocalIndexFactory
+    from aixplain.factories import IndexFactory
+    return IndexFactory
+
+
+def record_class():
+    if INDEX_BACKEND == "local":
+        from local_index import LocalRecord
+        return LocalRecord
+    from aixplain.modules.model.record import Record
+    return Record
+
+
+from answer_cache import SemanticAnswerCache
+from index_catalog import get_catalog
+from index_inventory import InventoryFile
+from ingest_verifier import verify_async
+from answer_stream import format_timing, stream_answer
+from tracing import export_on_exit, span
+from pdf_chunker import PDF_CHUNK_MAX_BYTES, PDF_CHUNK_MAX_PAGES, PDF_CHUNK_MAX_TOKENS, iter_pdf_chunks
+from pdf_text import format_extraction, iter_batches, iter_page_records
+from csv_chunker import CSV_CHUNK_MAX_BYTES, CSV_CHUNK_MAX_TOKENS, iter_csv_chunks
+from crawler import crawl_ingest, format_summary
+from keyword_index import get_keyword_index, index_file_async, keyword_search
+from retrieval import (
+    FANOUT_MAX_WORKERS,
+    HYBRID_RETRIEVAL,
+    build_context,
+    fan_out_search,
+    fused_prompt,
+    select_hits
+)
+from reranker import RERANK_ENABLED
+
+# Print answers token by token (falls back to polling partial output)
+STREAM_ANSWERS = os.getenv("POLICY_NAVIGATOR_STREAM", "1") != "0"
+
+# Cached answers per index; dropped whenever that index is upserted to
+ANSWER_CACHE = SemanticAnswerCache()
 
 SLACK_TOOL_ID = "686432941223092cb4294d3f"
 AGENT_ID = "69683539177e3b074a8a9f31"  # optional
@@ -50,6 +93,8 @@ AGENT_INSTRUCTIONS=(
 )
 
 def get_slack_tool():
+    from aixplain.factories.tool_factory import ToolFactory
+
     try:
         return ToolFactory.get(SLACK_TOOL_ID)
     except Exception as e:
@@ -57,73 +102,191 @@ def get_slack_tool():
         return None
     
 
-import os
 import tempfile
-import pandas as pd
-# from pypdf import PdfReader, PdfWriter
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Max chunk uploads (prepare + upsert) running at the same time
+INGEST_MAX_IN_FLIGHT = 4
+
+# ------------------------
+# PIPELINED CHUNK UPLOAD
+# ------------------------
+def _spill_buffer(buffer):
+    """
+    Write an in-memory chunk to a short-lived file (the SDK prepares records
+    from paths only) and release the buffer
+    """
+    stem, suffix = os.path.splitext(os.path.basename(buffer.name))
+    fd, path = tempfile.mkstemp(prefix=f"{stem}_", suffix=suffix)
+    with os.fdopen(fd, "wb") as f:
+        f.write(buffer.getbuffer())
+    buffer.close()
+    return path
+
+
+def upload_chunk_file(index, source):
+    """
+    Prepare + upsert one chunk, then delete its file. Returns elapsed seconds.
+    `source` is a temp file path, a BytesIO chunk or a ready text record;
+    buffers only touch disk here, inside the upload worker, for the
+    duration of the prepare call.
+    """
+    started = time.perf_counter()
+    if not isinstance(source, str) and not hasattr(source, "getbuffer"):
+        with span("index.upsert"):
+            index.upsert([source])
+        return time.perf_counter() - started
+
+    path = source if isinstance(source, str) else _spill_buffer(source)
+    try:
+        with span("prepare_record_from_file"):
+            record = index.prepare_record_from_file(path)
+        with span("index.upsert"):
+            index.upsert([record])
+        return time.perf_counter() - started
+    finally:
+        os.unlink(path)
+
+
+def pipelined_upload(index, chunks, max_in_flight=INGEST_MAX_IN_FLIGHT):
+    """
+    Upload (label, source) chunks through a bounded thread pool.
+
+    The splitter only runs max_in_flight chunks ahead of the uploads, so
+    buffered chunks and temp files stay bounded. Yields (label, seconds, error) in
+    chunk order; error is None on success.
+    """
+    max_in_flight = max(1, max_in_flight)
+    in_flight = deque()
+
+    def drain_one():
+        label, future = in_flight.popleft()
+        try:
+            return label, future.result(), None
+        except Exception as e:
+            return label, None, e
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for label, source in chunks:
+            if len(in_flight) >= max_in_flight:
+                yield drain_one()
+            in_flight.append((label, pool.submit(upload_chunk_file, index, source)))
+
+        while in_flight:
+            yield drain_one()
+
+
+def report_chunk_results(results, kind):
+    """
+    Print per-chunk timings and return (ok_labels, failed_count).
+    """
+    ok, failed = [], 0
+    for label, seconds, error in results:
+        if error is None:
+            ok.append(label)
+            print(f"✅ {kind} chunk {label} ingested in {seconds:.2f}s")
+        else:
+            failed += 1
+            print(f"❌ {kind} chunk {label} failed: {error}")
+    return ok, failed
 
 # ------------------------
 # CSV SPLITTER + INGEST
 # ------------------------
-def ingest_splt_csv(index, max_rows=10000):
+def _split_csv(cpath, max_bytes, max_tokens, row_counts):
+    Record = record_class()
+    name = os.path.basename(cpath)
+    doc_id = "csv_" + os.path.splitext(name)[0]
+    for chunk in iter_csv_chunks(cpath, max_bytes, max_tokens):
+        row_counts[chunk.label] = chunk.rows
+        yield chunk.label, Record(
+            id=f"{doc_id}_rows_{chunk.first_row}-{chunk.last_row}",
+            value=chunk.text,
+            value_type="text",
+            attributes={
+                "source": name,
+                "file_name": name,
+                "first_row": chunk.first_row,
+                "last_row": chunk.last_row,
+            }
+        )
+
+
+def ingest_splt_csv(index, max_bytes=CSV_CHUNK_MAX_BYTES, max_tokens=CSV_CHUNK_MAX_TOKENS,
+                    max_in_flight=INGEST_MAX_IN_FLIGHT):
+    """
+    Upload a large CSV as header-repeating text chunks packed to a byte
+    (and optional token) budget, each tagged with its row range
+    """
     cpath = clean_path(input("Enter CSV file path: "))
     if not os.path.exists(cpath):
         print("❌ File not found.")
         return
 
-    total_rows = 0
-    temp_files = []
-
-    try:
-        for i, chunk in enumerate(pd.read_csv(cpath, chunksize=max_rows)):
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".csv")
-            chunk.to_csv(temp_file.name, index=False)
-            temp_files.append(temp_file.name)
-
-            record = index.prepare_record_from_file(temp_file.name)
-            index.upsert([record])
-            total_rows += len(chunk)
-            print(f"✅ Chunk {i+1} ingested ({len(chunk)} rows)")
-
-        print(f"🎉 CSV ingestion completed. Total rows ingested: {total_rows}")
-
-    finally:
-        for f in temp_files:
-            os.unlink(f)
+    started = time.perf_counter()
+    row_counts = {}
+    ok, failed = report_chunk_results(
+        pipelined_upload(index, _split_csv(cpath, max_bytes, max_tokens, row_counts), max_in_flight),
+        "CSV"
+    )
+    total_rows = sum(row_counts[label] for label in ok)
+    if ok:
+        ANSWER_CACHE.invalidate(index.id)
+        get_catalog(index_factory()).record_upsert(index.id, len(ok))
+        index_file_async(index.id, cpath, csv_max_bytes=max_bytes, csv_max_tokens=max_tokens)
+
+    print(
+        f"🎉 CSV ingestion completed. Total rows ingested: {total_rows} "
+        f"({failed} chunk(s) failed, {time.perf_counter() - started:.2f}s)"
+    )
 
 # ------------------------
 # PDF SPLITTER + INGEST
 # ------------------------
-def ingest_splt_pdf(index, pages_per_chunk=20):
+def _split_pdf(reader, max_bytes, max_tokens, max_pages, name, page_counts):
+    for chunk in iter_pdf_chunks(reader, max_bytes, max_tokens, max_pages, name):
+        page_counts[chunk.label] = chunk.last_page - chunk.first_page + 1
+        yield chunk.label, chunk.buffer
+
+
+def ingest_splt_pdf(index, max_bytes=PDF_CHUNK_MAX_BYTES, max_tokens=PDF_CHUNK_MAX_TOKENS,
+                    max_pages=PDF_CHUNK_MAX_PAGES, max_in_flight=INGEST_MAX_IN_FLIGHT):
+    """
+    Upload a large PDF as in-memory chunks packed to a byte (and optional
+    token) budget, so image-heavy and text-only pages give similar chunk sizes
+    """
     path = clean_path(input("Enter PDF file path: "))
     if not os.path.exists(path):
         print(f"❌ File not found: {path}")
         return
 
+    from pypdf import PdfReader
+
     reader = PdfReader(path)
     total_pages = len(reader.pages)
-    temp_files = []
-
-    try:
-        for i in range(0, total_pages, pages_per_chunk):
-            writer = PdfWriter()
-            for page in reader.pages[i:i+pages_per_chunk]:
-                writer.add_page(page)
-
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            writer.write(temp_file.name)
-            temp_files.append(temp_file.name)
-
-            record = index.prepare_record_from_file(temp_file.name)
-            index.upsert([record])
-            print(f"✅ PDF chunk {i//pages_per_chunk + 1} ingested (pages {i+1}-{min(i+pages_per_chunk, total_pages)})")
-
-        print(f"🎉 PDF ingestion completed. Total pages: {total_pages}")
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    started = time.perf_counter()
+    page_counts = {}
+    ok, failed = report_chunk_results(
+        pipelined_upload(
+            index, _split_pdf(reader, max_bytes, max_tokens, max_pages, name, page_counts), max_in_flight
+        ),
+        "PDF"
+    )
+    if ok:
+        ANSWER_CACHE.invalidate(index.id)
+        get_catalog(index_factory()).record_upsert(index.id, len(ok))
+        index_file_async(index.id, path)
+
+    print(
+        f"🎉 PDF ingestion completed. Pages ingested: {sum(page_counts[label] for label in ok)}"
+        f"/{total_pages} in {len(ok)} chunk(s) "
+        f"({failed} failed, {time.perf_counter() - started:.2f}s)"
+    )
 
-    finally:
-        for f in temp_files:
-            os.unlink(f)
-    
 
 # =========================
 # INDEX UTILITIES
@@ -131,11 +294,7 @@ def ingest_splt_pdf(index, pages_per_chunk=20):
 
 
 def list_indexes():
-    all_indexes = IndexFactory.list()["results"]
-    return [
-        idx for idx in all_indexes
-        if idx.name.startswith(PROJECT_PREFIX)
-    ]
+    return get_catalog(index_factory()).list(PROJECT_PREFIX)
 
 
 def create_index():
@@ -145,11 +304,13 @@ def create_index():
     description = input("Enter index description: ").strip()
 
     print("📦 Creating index...")
-    index = IndexFactory.create(
+    index = index_factory().create(
         name=f"{PROJECT_PREFIX}{name}",
         description=description,
         embedding_model=EMBEDDING_MODEL_ID
     )
+    get_catalog(index_factory()).add(index)
+    get_catalog(index_factory()).set_document_count(index.id, 0)
 
     print(f"✅ Index '{name}' created.")
     return index
@@ -172,66 +333,32 @@ def select_index():
         print("❌ Invalid selection.")
         return None
 
-    index = IndexFactory.get(indexes[int(choice) - 1].id)
+    index = get_catalog(index_factory()).get(indexes[int(choice) - 1].id)
+    get_catalog(index_factory()).reconcile_async(index.id)
     print(f"📚 Selected index: {index.name}")
     return index
 def index_is_empty(index):
-    print("Checking if index is empty...")
-    try:
-        print(f"Index object type: {type(index)}")
-        print(f"Index ID: {getattr(index, 'id', 'No ID')}")
-        print(f"Index Name: {getattr(index, 'name', 'No Name')}")
-
-        # 1️⃣ Search for one document
-        resp = index.search("*", top_k=1)
-        #print(f"Raw search response: {resp}")
-
-        # 2️⃣ Extract results safely
-        results = resp.data if hasattr(resp, "data") else []
-        num_docs = len(results)
-        # print(f"🔹 Number of documents in index: {num_docs}")
-        if not hasattr(resp, "data") or resp.data is None:
-            print("⚠️ Search returned no data attribute.")
-            return True
-
-        num_chunks = len(resp.data)
-        print(f"🔹 Number of indexed chunks: {num_chunks}")
-        return num_docs == 0
-
-    except Exception as e:
-        print("⚠️ Failed to check index:", e)
-        return True
-def get_index_documents(index):
-    resp = index.search("*", top_k=1000)  # large enough to sample
-
-    documents = {}
-
-    for r in getattr(resp, "data", []):
-        meta = r.get("metadata", {}) or {}
-
-        # Prefer file-based sources
-        name = (
-            meta.get("file_name")
-            or meta.get("source")
-            or meta.get("url")
-            or "unknown"
-        )
-
-        ext = os.path.splitext(name)[1].lower() if "." in name else "url"
-
-        documents.setdefault(ext, set()).add(name)
-    # unique_files = {
-    #     r["metadata"]["file_name"]
-    #     for r in resp.data
-    #     if r.get("metadata") and "file_name" in r["metadata"]
-    #     }
-
-    # print(f"📄 Total uploaded files: {len(unique_files)}")
-
-        
-
-    
-    return documents
+    """
+    O(1) check against the locally tracked document count.
+    If the count is unknown, refresh it in the background and let the
+    question through; the agent reports missing sources itself.
+    """
+    catalog = get_catalog(index_factory())
+    count = catalog.document_count(index.id)
+    if count is None:
+        catalog.reconcile_async(index.id)
+        return False
+    return count == 0
+
+
+def refresh_index_inventory(index):
+    """
+    Incrementally update the on-disk inventory of the index's sources
+    """
+    inventory = InventoryFile(index.id)
+    added = inventory.refresh(index)
+    print(f"🗂 Inventory updated: {added} new source(s) -> {inventory.path}")
+    return inventory
 
 # def index_is_empty(index):
 #     print("\n🔍 Checking index state...")
@@ -304,8 +431,6 @@ def clean_path(path: str) -> str:
     #     print("❌ PDF ingestion failed:")
     #     print(e)
 
-from aixplain.modules.model.record import Record
-
 # def ingest_pdf(index):
 #     path = clean_path(input("Enter PDF file path: "))
 #     if not os.path.exists(path):
@@ -349,6 +474,18 @@ from aixplain.modules.model.record import Record
 #     except Exception as e:
 #         print("❌ PDF ingestion failed:")
 #         print(e)
+def verify_ingestion(index, doc_ids):
+    """
+    Confirm in the background that the new documents became searchable,
+    then refresh the index's document count
+    """
+    print("🔎 Verifying searchability in the background...")
+    verify_async(
+        index,
+        doc_ids,
+        on_done=lambda ready: get_catalog(index_factory()).reconcile(index.id)
+    )
+
 def ingest_pdf(index):
     path = clean_path(input("Enter PDF file path: "))
     
@@ -359,29 +496,53 @@ def ingest_pdf(index):
     print("📄 Parsing and indexing PDF (this may take a while)...")
 
     try:
-        record = index.prepare_record_from_file(path)
-        response = index.upsert([record])
+        with span("prepare_record_from_file"):
+            record = index.prepare_record_from_file(path)
+        with span("index.upsert"):
+            response = index.upsert([record])
+        ANSWER_CACHE.invalidate(index.id)
+        get_catalog(index_factory()).record_upsert(index.id)
+        index_file_async(index.id, path)
 
         doc_id = response.data[0]['document_id']
-        print(f"✅ PDF successfully indexed. Document ID: {doc_id}") 
-        # General Debugging
-        print(f"Intermediate steps: {response.data.intermediate_steps}")
-    
-        # 🔹 Immediate search check
-        results = index.search("Dietary Guidelines", top_k=3)
-        # if results:
-        #     print(f"🔹 Search test successful, {len(results)} record(s) retrieved.")
-        # else:
-        #     print("⚠️ Warning: No documents found on search. Server may need a moment to update.")
-
-        # 🔹 Fetch full index info (server side)
-        info = index.info()
-        print(f"🔹 Index now has {info['num_documents']} documents.")
+        print(f"✅ PDF upsert accepted. Document ID: {doc_id}")
+        verify_ingestion(index, [doc_id])
 
     except Exception as e:
         print("❌ PDF ingestion failed:")
         print(e)
 
+def ingest_pdf_text(index):
+    """
+    Extract page text locally (PyMuPDF across all cores) and upsert compact
+    per-page text records instead of the raw PDF
+    """
+    path = clean_path(input("Enter PDF file path: "))
+    if not os.path.exists(path):
+        print(f"❌ File not found: {path}")
+        return
+
+    print("📄 Extracting PDF text locally...")
+    started = time.perf_counter()
+    stats, ids = {}, []
+    try:
+        for batch in iter_batches(iter_page_records(path, record_class(), stats)):
+            with span("index.upsert"):
+                index.upsert(batch)
+            get_keyword_index(index.id).add(batch)
+            ids.extend(record.id for record in batch)
+    except Exception as e:
+        print("❌ PDF text ingestion failed:")
+        print(e)
+
+    if stats:
+        print(format_extraction(path, stats))
+    if ids:
+        ANSWER_CACHE.invalidate(index.id)
+        get_catalog(index_factory()).record_upsert(index.id, len(ids))
+        print(f"✅ {len(ids)} page record(s) upserted in {time.perf_counter() - started:.2f}s")
+        verify_ingestion(index, [ids[0], ids[-1]] if len(ids) > 1 else ids)
+
 def ingest_csv(index):
     cpath = clean_path(input("Enter CSV file path: "))
     if not os.path.exists(cpath):
@@ -391,20 +552,18 @@ def ingest_csv(index):
     print("📄 Parsing and indexing CSV (this may take a while)...")
     try:
         # Step 1: Prepare record from CSV
-        record = index.prepare_record_from_file(cpath)
+        with span("prepare_record_from_file"):
+            record = index.prepare_record_from_file(cpath)
         
         # Step 2: Upsert the record
-        response = index.upsert([record])
+        with span("index.upsert"):
+            response = index.upsert([record])
+        ANSWER_CACHE.invalidate(index.id)
+        get_catalog(index_factory()).record_upsert(index.id)
+        index_file_async(index.id, cpath)
         doc_id = response.data[0]["document_id"]
-        print(f"✅ CSV successfully indexed. Document ID: {doc_id}")
-
-        # 🔹 Optional: immediate search check
-        results = index.search("*", top_k=3)
-        print(f"🔹 Test search retrieved {len(getattr(results, 'data', []))} chunk(s).")
-
-        # 🔹 Full index info
-        info = index.info()
-        print(f"🔹 Index now has {info['num_documents']} documents.")
+        print(f"✅ CSV upsert accepted. Document ID: {doc_id}")
+        verify_ingestion(index, [doc_id])
 
     except Exception as e:
         print("❌ CSV ingestion failed:")
@@ -414,17 +573,48 @@ def ingest_csv(index):
 
 def ingest_url(index):
     url = input("Enter public URL: ").strip()
-    index.upsert(url)
+    with span("index.upsert"):
+        index.upsert(url)
+    ANSWER_CACHE.invalidate(index.id)
+    get_catalog(index_factory()).record_upsert(index.id)
     print("✅ Website ingested.")
 
 
 
+def crawl_site(index):
+    """
+    Crawl seed URLs / sitemaps; unchanged pages are skipped on re-crawls
+    """
+    raw = input("Enter seed URL(s) or sitemap.xml URL(s), comma-separated: ")
+    seeds = [u.strip() for u in raw.split(",") if u.strip()]
+    if not seeds:
+        print("❌ No URLs given.")
+        return
+
+    started = time.perf_counter()
+    keywords = get_keyword_index(index.id)
+    summary = crawl_ingest(index, seeds, record_class(), on_upsert=keywords.add,
+                           on_delete=lambda record_id: keywords.delete([record_id]))
+    if summary["ids"] or summary["gone"]:
+        ANSWER_CACHE.invalidate(index.id)
+        catalog = get_catalog(index_factory())
+        catalog.record_upsert(index.id, summary["new"])
+        catalog.record_delete(index.id, summary["gone"])
+    print(format_summary(summary, time.perf_counter() - started))
+    if summary["ids"]:
+        verify_ingestion(index, summary["ids"][-1:])
+
+
 def ingest_menu(index):
     while True:
         print("\n--- Ingest Menu ---")
         print("1) PDF")
         print("2) CSV")
         print("3) Website URL")
+        print("4) Large PDF (split + parallel upload)")
+        print("5) Large CSV (split + parallel upload)")
+        print("6) PDF (local text extraction)")
+        print("7) Crawl website (seed URLs / sitemap)")
         print("0) Back")
 
         choice = input("> ").strip()
@@ -435,6 +625,14 @@ def ingest_menu(index):
             ingest_csv(index)
         elif choice == "3":
             ingest_url(index)
+        elif choice == "4":
+            ingest_splt_pdf(index)
+        elif choice == "5":
+            ingest_splt_csv(index)
+        elif choice == "6":
+            ingest_pdf_text(index)
+        elif choice == "7":
+            crawl_site(index)
         elif choice == "0":
             break
         else:
@@ -467,8 +665,15 @@ def ingest_menu(index):
 #     )
 
 
-def get_or_create_agent(index):
+def get_or_create_agent(index=None):
+    """
+    Agent with the index (if any) and the Slack tool attached. Without an
+    index the agent only answers from context passed in the prompt.
+    """
+    from aixplain.factories import AgentFactory
+
     slack_tool = get_slack_tool()
+    tools = list({t.id: t for t in (index, slack_tool) if t is not None}.values())
 
     if AGENT_ID:
         try:
@@ -476,7 +681,7 @@ def get_or_create_agent(index):
             agent = AgentFactory.get(AGENT_ID)
             print(f"Agent found: {agent.name}")
             agent.instructions = AGENT_INSTRUCTIONS
-            agent.tools = list({t.id: t for t in ([index, slack_tool] if slack_tool else [index])}.values())
+            agent.tools = tools
             return agent
         except Exception:
             print("⚠️ Agent ID not found, falling back to name.")
@@ -485,7 +690,7 @@ def get_or_create_agent(index):
     for a in agents:
         if a.name == AGENT_NAME:
             agent = AgentFactory.get(a.id)
-            agent.tools = list({t.id: t for t in ([index, slack_tool] if slack_tool else [index])}.values())
+            agent.tools = tools
             return agent
 
     print("🤖 Creating new agent...")
@@ -493,7 +698,7 @@ def get_or_create_agent(index):
         name=AGENT_NAME,
         description="Answers policy questions using retrieved documents",
         instructions=AGENT_INSTRUCTIONS,
-        tools=[index, slack_tool] if slack_tool else [index]
+        tools=tools
     )
 
 def validate_runtime(agent, index):
@@ -533,13 +738,37 @@ def ask_question(agent, index):
             print("👋 Goodbye.")
             exit(0)
 
+        cached = ANSWER_CACHE.get(index.id, question)
+        if cached is not None:
+            print("Answer (cached):\n")
+            print(cached)
+            print("-" * 60)
+            continue
+
         print("\n⏳ Processing...\n")
         try:
-            response = agent.run(question)
-            # New API: response.data.output contains the text
-            output = getattr(response.data, "output", str(response))
-            print("Answer:\n")
-            print(output)
+            prompt = question
+            if HYBRID_RETRIEVAL or RERANK_ENABLED:
+                rankings, _, errors = fan_out_search(
+                    [index], question, keyword_search=keyword_search if HYBRID_RETRIEVAL else None)
+                for label, error in errors.items():
+                    print(f"⚠️ Search failed for {label}: {error}")
+                hits = select_hits(question, rankings)
+                if hits:
+                    prompt = fused_prompt(question, build_context(hits))
+            if STREAM_ANSWERS:
+                print("Answer:\n")
+                result = stream_answer(agent, prompt)
+                output = result.text
+                print(format_timing(result))
+            else:
+                with span("agent.run"):
+                    response = agent.run(prompt)
+                # New API: response.data.output contains the text
+                output = getattr(response.data, "output", None)
+                print("Answer:\n")
+                print(output or str(response))
+            ANSWER_CACHE.put(index.id, question, output)
             print("-" * 60)
         except Exception as e:
             print("❌ Failed to get answer:", e)
@@ -576,6 +805,68 @@ def ask_question(agent, index):
 # MAIN CLI
 # =========================
 
+def ask_across_indexes():
+    """
+    Search every PROJECT_PREFIX index concurrently, fuse the hits with
+    reciprocal-rank fusion and answer from one fused context
+    """
+    catalog = get_catalog(index_factory())
+    entries = list_indexes()
+    if not entries:
+        print("⚠️ No indexes found. Create one and ingest documents first.")
+        return
+
+    def load(entry):
+        try:
+            return catalog.get(entry.id)
+        except Exception as e:
+            print(f"⚠️ Skipping index {entry.name}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=min(FANOUT_MAX_WORKERS, len(entries))) as pool:
+        indexes = [index for index in pool.map(load, entries) if index is not None]
+    agent = get_or_create_agent()
+
+    print(f"\nCross-index ASK mode over {len(indexes)} index(es). Type 'back' to return.")
+    while True:
+        question = input("\nAsk your question: ").strip()
+        if question.lower() in ["back"]:
+            break
+        if question.lower() in ["exit", "quit"]:
+            print("👋 Goodbye.")
+            exit(0)
+        if not question:
+            continue
+
+        started = time.perf_counter()
+        rankings, timings, errors = fan_out_search(indexes, question, keyword_search=keyword_search)
+        hits = select_hits(question, rankings)
+        elapsed = time.perf_counter() - started
+        slowest = max(timings.values()) if timings else 0.0
+        print(f"🔎 {len(indexes)} index(es) searched in {elapsed:.2f}s "
+              f"(slowest {slowest:.2f}s), {len(hits)} fused hit(s)")
+        for index_id, error in errors.items():
+            print(f"⚠️ Search failed for {index_id}: {error}")
+        if not hits:
+            print("⚠️ No matching passages in any index.")
+            continue
+
+        prompt = fused_prompt(question, build_context(hits))
+        try:
+            if STREAM_ANSWERS:
+                print("Answer:\n")
+                result = stream_answer(agent, prompt)
+                print(format_timing(result))
+            else:
+                with span("agent.run"):
+                    response = agent.run(prompt)
+                print("Answer:\n")
+                print(getattr(response.data, "output", str(response)))
+            print("-" * 60)
+        except Exception as e:
+            print("❌ Failed to get answer:", e)
+
+
 def index_session(index):
     agent = get_or_create_agent(index)
 
@@ -583,6 +874,7 @@ def index_session(index):
         print(f"\n--- Index: {index.name} ---")
         print("1) Ingest documents")
         print("2) Ask a question")
+        print("3) List documents")
         print("0) Back to main menu")
 
         choice = input("> ").strip()
@@ -609,6 +901,13 @@ def index_session(index):
             #         break
             #     if response2.lower() in ["n", "exit"]:
             #         exit(0)
+        elif choice == "3":
+            inventory = refresh_index_inventory(index)
+            counts = {}
+            for item in inventory.iter_sources():
+                counts[item["kind"]] = counts.get(item["kind"], 0) + 1
+            for ext, n in sorted(counts.items()):
+                print(f"{ext}: {n} documents")
         elif choice == "0":
             break
         else:
@@ -622,10 +921,13 @@ def main():
     logging.getLogger("root").setLevel(logging.WARNING)
     print("🚀 Policy Navigator (Multi-Index RAG CLI)")
     logging.getLogger("aixplain").setLevel(logging.WARNING)
+    # POLICY_NAVIGATOR_METRICS_FILE=path writes per-stage latency histograms on exit
+    export_on_exit()
     while True:
         print("\n--- Main Menu ---")
         print("1) Create a new index (topic)")
         print("2) List & select existing index")
+        print("3) Ask across all indexes")
         print("0) Exit")
 
         choice = input("> ").strip()
@@ -637,6 +939,8 @@ def main():
             index = select_index()
             if index:
                 index_session(index)
+        elif choice == "3":
+            ask_across_indexes()
         elif choice == "0":
             print("👋 Goodbye.")
             break
@@ -3,24 +3,42 @@
 rag_agent.py
 Reusable Agentic RAG with Aixplain
 """
-import requests
 import re
+import json
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import os
 import sys
 import argparse
-from aixplain.factories import AgentFactory, IndexFactory
-from aixplain.modules.model.record import Record
-from aixplain.modules.model.index_model import Splitter
-from aixplain.enums.splitting_options import SplittingOptions
-from aixplain.factories.tool_factory import ToolFactory
+from ingest_manifest import IngestManifest, content_record_id
+from http_cache import HttpCache
+from answer_cache import SemanticAnswerCache
+from index_catalog import get_catalog
+from slack_notifier import SlackNotifier
+from answer_stream import format_timing, stream_answer
+from tracing import METRICS_FILE, export_on_exit, span, timed_call, traced
+from pdf_text import format_extraction, iter_batches, iter_page_records
+from crawler import CRAWL_MAX_DEPTH, CRAWL_MAX_PAGES, crawl_ingest, format_summary
+from keyword_index import get_keyword_index, index_file_async, keyword_search
+from retrieval import (
+    HYBRID_RETRIEVAL,
+    build_context,
+    fan_out_search,
+    fused_prompt,
+    select_hits
+)
+from reranker import RERANK_ENABLED
 
 
 # -----------------------------
 # CONFIG
 # -----------------------------
 SLACK_TOOL_ID = "686432941223092cb4294d3f"
+SLACK_CHANNEL = "#policy-updates"
 AGENT_ID = "69669a2d4986b4b80a7d0d1d"   # Policy Navigator Agent
 CSV_INDEX_ID = "YOUR_EXISTING_CSV_INDEX_ID"
 PDF_INDEX_ID = "YOUR_EXISTING_PDF_INDEX_ID"
@@ -30,16 +48,66 @@ CSV_FILE = "rows.csv"
 PDF_FILE = "policy.pdf"
 URL = "https://www.ftc.gov/tips-advice/business-center/privacy-and-security"
 
+# Streaming CSV ingestion: records per upsert and total bytes held in memory
+CSV_BATCH_RECORDS = 500
+CSV_MEMORY_CEILING_BYTES = 64 * 1024 * 1024
+
+# Batch question answering (--questions)
+BATCH_CONCURRENCY = 4
+BATCH_RATE = 2.0  # questions started per second; 0 disables rate limiting
+
 DOCLING = "677bee6c6eb56331f9192a91"
 FIRECRAWL = "6748d4cff12784b6014324e2"
 EMBEDDINGS = "673248d66eb563b2b00f75d1"
 LLM = "67be216bd8f6a65d6f74d5e9"  # Claude Sonnet
 
+# "aixplain" (remote indexes) or "local" (offline local_index backend)
+INDEX_BACKEND = os.getenv("POLICY_NAVIGATOR_INDEX_BACKEND", "aixplain")
+
+
+def index_factory():
+    """
+    Index factory for the configured backend. The aixplain SDK is imported
+    here rather than at module load, so --help and startup stay fast.
+    """
+    if INDEX_BACKEND == "local":
+        from local_index import LocalIndexFactory
+        return LocalIndexFactory
+    from aixplain.factories import IndexFactory
+    return IndexFactory
+
+
+def record_class():
+    if INDEX_BACKEND == "local":
+        from local_index import LocalRecord
+        return LocalRecord
+    from aixplain.modules.model.record import Record
+    return Record
+
+
+def line_splitter(split_length, split_overlap):
+    """LINE splitter for the configured backend (the SDK is not needed for local)."""
+    if INDEX_BACKEND == "local":
+        from local_index import LocalSplitter
+        return LocalSplitter(split=True, split_by="line", split_length=split_length,
+                             split_overlap=split_overlap)
+    from aixplain.enums.splitting_options import SplittingOptions
+    from aixplain.modules.model.index_model import Splitter
+    return Splitter(split=True, split_by=SplittingOptions.LINE, split_length=split_length,
+                    split_overlap=split_overlap)
+
+
+# Answers are cached per agent: the agent reads all three indexes, so any
+# ingest into them invalidates its cached answers
+ANSWER_CACHE = SemanticAnswerCache()
+
 # -----------------------------
 # LOAD AGENT (NO CREATION)
 # -----------------------------
 
 def load_agent():
+    from aixplain.factories import AgentFactory
+
     try:
         agent = AgentFactory.get(AGENT_ID)
         print("✅ Existing agent loaded")
@@ -53,17 +121,25 @@ def load_agent():
 # -----------------------------
 # CUSTOM PYTHON TOOL (CSV)
 # -----------------------------
+@traced("send_slack_message")
+def post_slack_message(slack_tool, channel: str, message: str):
+    """
+    Post to Slack and raise on failure (used by the background notifier)
+    """
+    slack_tool.execute({
+        "action": "SLACK_SENDS_A_MESSAGE_TO_A_SLACK_CHANNEL",
+        "data": {
+            "channel": channel,
+            "text": message
+        }
+    })
+
+
 def send_slack_message(slack_tool, channel: str, message: str):
     print("Sending Slack message...")
 
     try:
-        slack_tool.execute({
-            "action": "SLACK_SENDS_A_MESSAGE_TO_A_SLACK_CHANNEL",
-            "data": {
-                "channel": channel,
-                "text": message
-            }
-        })
+        post_slack_message(slack_tool, channel, message)
         print("✅ Slack message sent")
 
     except Exception as e:
@@ -87,56 +163,225 @@ def send_slack_message(slack_tool, channel: str, message: str):
 #         print("Sending Slack message...inside except")
 #         print(f"⚠️ Slack message failed: {e}")
 
-def ingest_csv(csv_path):
+def iter_csv_records(csv_path, stable_ids=False):
+    """
+    Lazily yield one Record per CSV line.
+    With stable_ids, the record ID is a hash of the line instead of its position.
+    """
+    Record = record_class()
+
+    with open(csv_path, "r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(f):
+            yield Record(
+                id=content_record_id(line) if stable_ids else f"csv_{i}",
+                value=line,
+                value_type="text",
+                attributes={"source": "csv_dataset"}
+            )
+
+
+def iter_record_batches(records, max_records=CSV_BATCH_RECORDS,
+                        max_bytes=CSV_MEMORY_CEILING_BYTES // 2):
+    """
+    Group records into batches bounded by record count and UTF-8 byte size
+    """
+    batch, batch_bytes = [], 0
+    for record in records:
+        size = len(record.value.encode("utf-8"))
+        if batch and (len(batch) >= max_records or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(record)
+        batch_bytes += size
+
+    if batch:
+        yield batch
+
+
+def ingest_csv(csv_path, batch_records=CSV_BATCH_RECORDS,
+               memory_ceiling_bytes=CSV_MEMORY_CEILING_BYTES,
+               delta=False, dataset=None):
+    """
+    Stream a CSV into the index in bounded batches.
+
+    At most two batches are held at once (one uploading, one being read),
+    so each batch gets half of memory_ceiling_bytes.
+
+    With delta=True, record IDs are content hashes and a local manifest
+    tracks what was pushed: only new rows are upserted and rows that
+    disappeared from the dataset are deleted from the index.
+
+    Returns True if every batch was upserted.
+    """
+    manifest = None
     try:
-        index = IndexFactory.get(CSV_INDEX_ID)
+        index = get_catalog(index_factory()).get(CSV_INDEX_ID)
+        splitter = line_splitter(split_length=50, split_overlap=5)
+
+        records = iter_csv_records(csv_path, stable_ids=delta)
+        keywords = get_keyword_index(CSV_INDEX_ID)
+        if delta:
+            manifest = IngestManifest()
+            dataset = dataset or os.path.basename(csv_path)
+            run_id = manifest.start_run()
+            records = (
+                r for r in records
+                if manifest.mark_seen(CSV_INDEX_ID, dataset, r.id, run_id)
+            )
 
-        splitter = Splitter(
-            split=True,
-            split_by=SplittingOptions.LINE,
-            split_length=50,
-            split_overlap=5
+        def on_success(batch):
+            keywords.add(batch, splitter=splitter)
+            if manifest is not None:
+                manifest.mark_pushed(CSV_INDEX_ID, dataset, [r.id for r in batch])
+
+        batches = iter_record_batches(
+            records,
+            max_records=batch_records,
+            max_bytes=max(1, memory_ceiling_bytes // 2)
         )
 
-        records = []
-        with open(csv_path, "r", encoding="utf-8", errors="ignore") as f:
-            for i, line in enumerate(f):
-                records.append(
-                    Record(
-                        id=f"csv_{i}",
-                        value=line,
-                        value_type="text",
-                        attributes={"source": "csv_dataset"}
+        started = time.perf_counter()
+        ingested, failed = 0, 0
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = None
+            for batch in batches:
+                future = pool.submit(timed_call, "index.upsert", index.upsert, batch, splitter=splitter)
+                if pending is not None:
+                    ingested, failed = _collect_batch(
+                        pending, ingested, failed, started, on_success
                     )
+                pending = (future, batch)
+            if pending is not None:
+                ingested, failed = _collect_batch(
+                    pending, ingested, failed, started, on_success
                 )
 
-        index.upsert(records, splitter=splitter)
-        print(f"✅ CSV ingested: {csv_path}")
+        elapsed = time.perf_counter() - started
+        rate = ingested / elapsed if elapsed > 0 else 0.0
+        print(
+            f"✅ CSV ingested: {csv_path} "
+            f"({ingested} records, {failed} failed, {rate:.1f} records/sec)"
+        )
+
+        get_catalog(index_factory()).record_upsert(CSV_INDEX_ID, ingested)
+        if delta:
+            _delete_removed_rows(index, manifest, dataset, run_id)
+
+        ANSWER_CACHE.invalidate(AGENT_ID)
+        return failed == 0
 
     except Exception as e:
         print(f"⚠️ CSV ingestion failed: {e}")
+        return False
+    finally:
+        if manifest is not None:
+            manifest.close()
+
+
+def _collect_batch(pending, ingested, failed, started, on_success=None):
+    future, batch = pending
+    try:
+        future.result()
+        if on_success:
+            on_success(batch)
+        ingested += len(batch)
+        elapsed = time.perf_counter() - started
+        rate = ingested / elapsed if elapsed > 0 else 0.0
+        print(f"🔹 Batch upserted: {len(batch)} records ({ingested} total, {rate:.1f} records/sec)")
+    except Exception as e:
+        failed += len(batch)
+        print(f"⚠️ Batch of {len(batch)} records failed: {e}")
+    return ingested, failed
+
+
+def _delete_removed_rows(index, manifest, dataset, run_id):
+    removed, deleted, failed = [], 0, 0
+    for record_id, pushed in manifest.stale_ids(CSV_INDEX_ID, dataset, run_id):
+        if pushed:
+            try:
+                index.delete_record(record_id)
+                deleted += 1
+            except Exception as e:
+                failed += 1
+                print(f"⚠️ Failed to delete removed row {record_id}: {e}")
+                continue
+        removed.append(record_id)
+
+    manifest.forget(CSV_INDEX_ID, dataset, removed)
+    get_keyword_index(CSV_INDEX_ID).delete(removed)
+    get_catalog(index_factory()).record_delete(CSV_INDEX_ID, deleted)
+    print(f"🧹 Removed rows deleted: {deleted} ({failed} failed)")
 
 # -----------------------------
 # MARKETPLACE TOOLS (PDF / WEB)
 # -----------------------------
 
-def ingest_pdf(pdf_path):
+def ingest_pdf(pdf_path, extract_text=False):
+    """
+    Upload the PDF for server-side parsing, or with extract_text=True
+    extract page text locally in parallel and upsert per-page text records.
+    Returns True on success.
+    """
     try:
-        index = IndexFactory.get(PDF_INDEX_ID)
-        index.upsert(pdf_path)  # marketplace PDF parsing
+        index = get_catalog(index_factory()).get(PDF_INDEX_ID)
+        if extract_text:
+            stats, pages = {}, 0
+            for batch in iter_batches(iter_page_records(pdf_path, record_class(), stats)):
+                with span("index.upsert"):
+                    index.upsert(batch)
+                get_keyword_index(PDF_INDEX_ID).add(batch)
+                pages += len(batch)
+            print(format_extraction(pdf_path, stats))
+        else:
+            with span("index.upsert"):
+                index.upsert(pdf_path)  # marketplace PDF parsing
+            index_file_async(PDF_INDEX_ID, pdf_path)
+            pages = 1
+        ANSWER_CACHE.invalidate(AGENT_ID)
+        get_catalog(index_factory()).record_upsert(PDF_INDEX_ID, pages)
         print(f"✅ PDF ingested: {pdf_path}")
+        return True
     except Exception as e:
         print(f"⚠️ PDF ingestion failed: {e}")
+        return False
 
 def ingest_url(url):
     try:
-        index = IndexFactory.get(WEB_INDEX_ID)
-        index.upsert(url)  # marketplace web scraping
+        index = get_catalog(index_factory()).get(WEB_INDEX_ID)
+        with span("index.upsert"):
+            index.upsert(url)  # marketplace web scraping
+        ANSWER_CACHE.invalidate(AGENT_ID)
+        get_catalog(index_factory()).record_upsert(WEB_INDEX_ID)
         print(f"✅ URL ingested: {url}")
+        return True
     except Exception as e:
         print(f"⚠️ URL ingestion failed: {e}")
+        return False
 
-from aixplain.factories.tool_factory import ToolFactory
+def crawl_website(seeds, max_pages=CRAWL_MAX_PAGES, max_depth=CRAWL_MAX_DEPTH, public_only=False):
+    """
+    Crawl seed URLs / sitemaps into the web index, re-ingesting only pages
+    that are new or changed since the last crawl. public_only refuses
+    private/internal hosts (the HTTP service sets it). Returns the crawl
+    summary, or None if the crawl could not run.
+    """
+    try:
+        index = get_catalog(index_factory()).get(WEB_INDEX_ID)
+        started = time.perf_counter()
+        keywords = get_keyword_index(WEB_INDEX_ID)
+        summary = crawl_ingest(index, seeds, record_class(), max_pages=max_pages, max_depth=max_depth,
+                               public_only=public_only,
+                               on_upsert=keywords.add, on_delete=lambda record_id: keywords.delete([record_id]))
+        if summary["ids"] or summary["gone"]:
+            ANSWER_CACHE.invalidate(AGENT_ID)
+            catalog = get_catalog(index_factory())
+            catalog.record_upsert(WEB_INDEX_ID, summary["new"])
+            catalog.record_delete(WEB_INDEX_ID, summary["gone"])
+        print(format_summary(summary, time.perf_counter() - started))
+        return summary
+    except Exception as e:
+        print(f"⚠️ Crawl failed: {e}")
+        return None
 
 SLACK_TOOL_ID = "686432941223092cb4294d3f"
 SLACK_TOOL_NAME = "connector-aixplain-slack"
@@ -155,6 +400,8 @@ def load_slack_tool(agent):
 
     # 2. Attach Slack tool only if missing
     try:
+        from aixplain.factories.tool_factory import ToolFactory
+
         slack_tool = ToolFactory.get(SLACK_TOOL_ID)
         agent.tools.append(slack_tool)
         print("✅ Slack tool attached to agent")
@@ -185,7 +432,73 @@ def load_slack_tool(agent):
 # -----------------------------
 # INTERACTIVE CLI
 # -----------------------------
-def interactive_loop(agent):
+def is_executive_order_question(question: str):
+    """
+    Same rule as extract_executive_order_numbers: an EO / Executive Order
+    mention followed by a number
+    """
+    return _EO_MENTION.search(question) is not None
+
+
+def answer_executive_order_question(question: str):
+    eo_numbers = extract_executive_order_numbers(question)
+    if not eo_numbers:
+        return "Please specify an Executive Order number."
+    return check_executive_order_statuses(eo_numbers)
+
+
+def rag_prompt(question: str):
+    """
+    The question itself, or with HYBRID_RETRIEVAL / RERANK_ENABLED a prompt
+    carrying the fused (and reranked) hits from the CSV, PDF and web indexes
+    """
+    if not (HYBRID_RETRIEVAL or RERANK_ENABLED):
+        return question
+
+    catalog = get_catalog(index_factory())
+    indexes = []
+    for index_id in (CSV_INDEX_ID, PDF_INDEX_ID, WEB_INDEX_ID):
+        try:
+            indexes.append(catalog.get(index_id))
+        except Exception as e:
+            print(f"⚠️ Skipping index {index_id}: {e}")
+    if not indexes:
+        return question
+    rankings, _, errors = fan_out_search(
+        indexes, question, keyword_search=keyword_search if HYBRID_RETRIEVAL else None)
+    for label, error in errors.items():
+        print(f"⚠️ Search failed for {label}: {error}")
+    hits = select_hits(question, rankings)
+    return fused_prompt(question, build_context(hits)) if hits else question
+
+
+def answer_question(agent, question: str):
+    """
+    Route one question like interactive_loop does.
+    Returns (route, answer) with route in "eo", "cache" or "rag".
+    """
+    if is_executive_order_question(question):
+        return "eo", answer_executive_order_question(question)
+
+    answer = ANSWER_CACHE.get(AGENT_ID, question)
+    if answer is not None:
+        return "cache", answer
+
+    prompt = rag_prompt(question)
+    with span("agent.run"):
+        response = agent.run(prompt)
+    answer = response.data.output
+    ANSWER_CACHE.put(AGENT_ID, question, answer)
+    return "rag", answer
+
+
+def interactive_loop(agent, slack_tool=None, stream=True):
+    notifier = None
+    if slack_tool:
+        notifier = SlackNotifier(
+            lambda channel, text: post_slack_message(slack_tool, channel, text)
+        )
+
     print("\n=== Policy Navigator Agent (Agentic RAG) ===")
     print("Ask questions. Type 'exit' to quit.\n")
 
@@ -196,33 +509,38 @@ def interactive_loop(agent):
                 print("Bye 👋")
                 break
 
-            # --- AGENTIC ROUTING ---
-            if "executive order" in q.lower():
-                eo_number = extract_executive_order_number(q)
+            streamed = False
 
-                if eo_number:
-                    answer = check_executive_order_status(eo_number)
-                else:
-                    answer = "Please specify an Executive Order number."
+            # --- AGENTIC ROUTING ---
+            if is_executive_order_question(q):
+                answer = answer_executive_order_question(q)
 
             else:
-                # Default: RAG
-                response = agent.run(q)
-                answer = response.data.output
+                # Default: RAG (near-duplicate questions served from cache)
+                answer = ANSWER_CACHE.get(AGENT_ID, q)
+                if answer is not None:
+                    print("⚡ Answer served from cache")
+                elif stream:
+                    print("\nAnswer:")
+                    result = stream_answer(agent, rag_prompt(q))
+                    answer = result.text
+                    streamed = True
+                    print(format_timing(result))
+                    ANSWER_CACHE.put(AGENT_ID, q, answer)
+                else:
+                    _, answer = answer_question(agent, q)
 
-            print("\nAnswer:")
-            print(answer)
+            if not streamed:
+                print("\nAnswer:")
+                print(answer)
             print("-" * 60)
 
-            # Slack notification (external tool)
-            # if slack_tool:
-            #     print(slack_tool.name)
-
-            #     send_slack_message(
-            #         slack_tool,
-            #         channel="#policy-updates",
-            #         message=f"*Policy Navigator Update:*\n{answer}"
-            #     )
+            # Slack notification (external tool): queued, never blocks answering
+            if notifier:
+                notifier.notify(
+                    SLACK_CHANNEL,
+                    f"*Policy Navigator Update:*\n{answer}"
+                )
 
         except KeyboardInterrupt:
             print("\nInterrupted. Exiting.")
@@ -230,6 +548,10 @@ def interactive_loop(agent):
         except Exception as e:
             print(f"⚠️ Error: {e}")
 
+    if notifier:
+        print("Flushing Slack notifications...")
+        notifier.close(timeout=30)
+
 
 # def interactive_loop(agent, slack_tool):
 #     print("\n=== Policy Navigator Agent (Agentic RAG) ===")
@@ -293,6 +615,8 @@ def check_executive_order_status(order_number: str):
     """
     Checks whether an Executive Order is still active using Federal Register API
     """
+    import requests
+
     params = {
         "conditions[term]": f"Executive Order {order_number}",
         "per_page": 1,
@@ -356,20 +680,50 @@ def check_executive_order_status(order_number: str):
 
 #------------
 
+# "Executive Order 14028", "EO 14028 and 14110", "E.O. No. 14028, 14110 or EO 14117";
+# other numbers in the question (years, CFR parts) are not EO numbers
+EO_LISTED_NUMBERS = range(10000, 20000)  # numbers listed without their own "EO" (EO 10000 is from 1948)
+_EO_PREFIX = r"(?:executive\s+orders?|e\.?\s?o\.?s?)\s*(?:no\.?|number|#)?\s*"
+_EO_MENTION = re.compile(
+    rf"\b{_EO_PREFIX}\d{{4,6}}\b(?:\s*(?:,|and|&|or)\s*(?:{_EO_PREFIX})?\d{{4,6}}\b)*",
+    re.IGNORECASE,
+)
+_EO_ITEM = re.compile(rf"(\b{_EO_PREFIX})?\b(\d{{4,6}})\b", re.IGNORECASE)
+
+
+def extract_executive_order_numbers(question: str):
+    """
+    Extract every EO number from user question (in order, without duplicates)
+    """
+    numbers = []
+    for mention in _EO_MENTION.finditer(question):
+        for prefix, number in _EO_ITEM.findall(mention.group(0)):
+            if prefix or int(number) in EO_LISTED_NUMBERS:
+                numbers.append(number)
+    return list(dict.fromkeys(numbers))
+
+
 def extract_executive_order_number(question: str):
     """
     Extract EO number from user question
     """
-    match = re.search(r"\b(\d{4,6})\b", question)
-    return match.group(1) if match else None
+    numbers = extract_executive_order_numbers(question)
+    return numbers[0] if numbers else None
 
 # -----------------------------
 # CUSTOM TOOL: CHECK EXECUTIVE ORDER STATUS
 FEDERAL_REGISTER_API = "https://www.federalregister.gov/api/v1/documents.json"
+EO_CACHE_TTL = 6 * 3600  # seconds before a cached EO lookup is revalidated
+EO_MAX_CONCURRENCY = 8  # parallel lookups when a question names several EOs
+
+# Shared keep-alive session + on-disk cache for Federal Register lookups
+EO_CACHE = HttpCache(ttl=EO_CACHE_TTL)
 
+@traced("check_executive_order_status")
 def check_executive_order_status(order_number: str):
     """
-    Check Executive Order status using the Federal Register API
+    Check Executive Order status using the Federal Register API.
+    Responses are cached on disk and revalidated with ETag/Last-Modified.
     """
     params = {
         "conditions[term]": f"Executive Order {order_number}",
@@ -378,13 +732,7 @@ def check_executive_order_status(order_number: str):
     }
 
     try:
-        response = requests.get(
-            FEDERAL_REGISTER_API,
-            params=params,
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = EO_CACHE.get_json(FEDERAL_REGISTER_API, params=params, timeout=10)
 
         if not data.get("results"):
             return (
@@ -411,6 +759,19 @@ def check_executive_order_status(order_number: str):
     except Exception as e:
         return f"Failed to check Executive Order {order_number}: {e}"
 
+def check_executive_order_statuses(order_numbers):
+    """
+    Look up several Executive Orders concurrently and merge the answers
+    """
+    if len(order_numbers) == 1:
+        return check_executive_order_status(order_numbers[0])
+
+    workers = min(len(order_numbers), EO_MAX_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        answers = list(pool.map(check_executive_order_status, order_numbers))
+
+    return "\n\n".join(answers)
+
 def format_answer_with_sources(response):
     answer = response.data.output
 
@@ -434,6 +795,124 @@ def format_answer_with_sources(response):
         "\n".join(sources)
     )
 
+# -----------------------------
+# BATCH QUESTION ANSWERING
+# -----------------------------
+
+class RateLimiter:
+    """
+    Spaces call starts at least 1/rate seconds apart across threads
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def read_questions(path):
+    """
+    One question per line, or JSONL objects with a "question" (and optional "id").
+    Yields (id, question, error); a malformed line gets question None and
+    an error instead of aborting the batch.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith("{"):
+                yield n, line, None
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"line {n}: invalid JSON ({e})"
+                continue
+            question = item.get("question") if isinstance(item, dict) else None
+            qid = item.get("id", n) if isinstance(item, dict) else n
+            if not isinstance(question, str) or not question.strip():
+                yield qid, None, f"line {n}: missing \"question\""
+            else:
+                yield qid, question.strip(), None
+
+
+def percentile(values, pct):
+    """
+    Nearest-rank percentile of a non-empty list
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def run_batch(agent, questions_path, output_path, concurrency=BATCH_CONCURRENCY, rate=BATCH_RATE):
+    """
+    Answer every question in questions_path through the EO/RAG router with
+    up to `concurrency` questions in flight, writing JSONL results as they finish
+    """
+    limiter = RateLimiter(rate)
+
+    def run_one(qid, question, error=None):
+        if error is not None:
+            return {"id": qid, "question": question, "route": "error", "answer": None,
+                    "error": error, "latency_s": 0.0}
+        limiter.wait()
+        started = time.perf_counter()
+        try:
+            route, answer = answer_question(agent, question)
+            error = None
+        except Exception as e:
+            route, answer, error = "error", None, str(e)
+        return {
+            "id": qid,
+            "question": question,
+            "route": route,
+            "answer": answer,
+            "error": error,
+            "latency_s": round(time.perf_counter() - started, 4),
+        }
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    with open(output_path, "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(run_one, *item) for item in read_questions(questions_path)]
+        for future in as_completed(futures):
+            result = future.result()
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            if result["question"] is not None:
+                latencies.append(result["latency_s"])
+            if result["error"]:
+                errors += 1
+                print(f"❌ Question {result['id']} failed: {result['error']}")
+            else:
+                print(f"✅ Question {result['id']} answered ({result['route']}, {result['latency_s']:.2f}s)")
+
+    wall = time.perf_counter() - started
+    summary = {
+        "questions": len(futures),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_qps": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "p50_s": percentile(latencies, 50) if latencies else None,
+        "p95_s": percentile(latencies, 95) if latencies else None,
+    }
+    print(f"📊 Batch summary: {json.dumps(summary)}")
+    print(f"📄 Results written to {output_path}")
+    return summary
+
 # -----------------------------
 # MAIN
 # -----------------------------
@@ -443,21 +922,69 @@ def main():
     parser.add_argument("--ingest-csv", help="Path to CSV dataset")
     parser.add_argument("--ingest-pdf", help="Path to PDF document")
     parser.add_argument("--ingest-url", help="Public website URL")
-
-    agent = load_agent()
-    slack_tool = load_slack_tool(agent)
+    parser.add_argument("--crawl", nargs="+", metavar="URL",
+                        help="Crawl seed URLs or sitemap.xml URLs into the web index")
+    parser.add_argument("--crawl-max-pages", type=int, default=CRAWL_MAX_PAGES)
+    parser.add_argument("--crawl-depth", type=int, default=CRAWL_MAX_DEPTH,
+                        help="Link depth followed from each seed")
+    parser.add_argument("--pdf-extract-text", action="store_true",
+                        help="Extract PDF text locally (PyMuPDF) and upsert per-page text records")
+    parser.add_argument("--csv-batch-records", type=int, default=CSV_BATCH_RECORDS,
+                        help="Max records per CSV upsert batch")
+    parser.add_argument("--csv-memory-mb", type=int,
+                        default=CSV_MEMORY_CEILING_BYTES // (1024 * 1024),
+                        help="Memory ceiling (MB) for in-flight CSV batches")
+    parser.add_argument("--csv-delta", action="store_true",
+                        help="Content-hash record IDs; upsert only new rows, delete removed ones")
+    parser.add_argument("--csv-dataset",
+                        help="Dataset name in the ingest manifest (default: CSV file name)")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Print answers only once complete")
+    parser.add_argument("--metrics-file",
+                        help="Write per-stage latency histograms (Prometheus text) here on exit")
+    parser.add_argument("--questions",
+                        help="Batch mode: file with one question per line (or JSONL)")
+    parser.add_argument("--output", default="batch_results.jsonl",
+                        help="Batch mode: JSONL results file")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help="Batch mode: concurrent questions")
+    parser.add_argument("--rate", type=float, default=BATCH_RATE,
+                        help="Batch mode: max questions started per second (0 = unlimited)")
+    parser.add_argument("--ingest-only", action="store_true",
+                        help="Exit after ingestion without loading the agent")
 
     args = parser.parse_args()
+    export_on_exit(args.metrics_file or METRICS_FILE)
     if args.ingest_csv:
-        ingest_csv(args.ingest_csv)
+        ingest_csv(
+            args.ingest_csv,
+            batch_records=args.csv_batch_records,
+            memory_ceiling_bytes=args.csv_memory_mb * 1024 * 1024,
+            delta=args.csv_delta,
+            dataset=args.csv_dataset
+        )
 
     if args.ingest_pdf:
-        ingest_pdf(args.ingest_pdf)
+        ingest_pdf(args.ingest_pdf, extract_text=args.pdf_extract_text)
 
     if args.ingest_url:
         ingest_url(args.ingest_url)
 
-    interactive_loop(agent)
+    if args.crawl:
+        crawl_website(args.crawl, args.crawl_max_pages, args.crawl_depth)
+
+    if args.ingest_only:
+        return
+
+    # Remote handles are resolved only once a mode actually needs them
+    agent = load_agent()
+
+    if args.questions:
+        run_batch(agent, args.questions, args.output, args.concurrency, args.rate)
+        return
+
+    slack_tool = load_slack_tool(agent)
+    interactive_loop(agent, slack_tool, stream=not args.no_stream)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+reranker.py
+Optional CPU cross-encoder rerank of retrieved passages, with a score cache
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+RERANK_ENABLED = os.getenv("POLICY_NAVIGATOR_RERANK", "0") == "1"
+RERANK_MODEL = os.getenv("POLICY_NAVIGATOR_RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = 30     # fused hits handed to the cross-encoder
+RERANK_TOP_K = 5           # hits kept for the answer context
+RERANK_BATCH_SIZE = 32
+RERANK_MAX_CHARS = 2000    # passage prefix scored; the model truncates at 512 tokens anyway
+RERANK_CACHE_SIZE = 10000  # (query, passage) scores kept in memory
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model(name=RERANK_MODEL):
+    """
+    The cross-encoder, loaded on first use and shared by all threads
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            from sentence_transformers import CrossEncoder
+            print(f"⏳ Loading rerank model {name}...")
+            _model = CrossEncoder(name, max_length=512, device="cpu")
+        return _model
+
+
+def passage_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    LRU of cross-encoder scores keyed by (query, passage hash)
+    """
+
+    def __init__(self, max_entries=RERANK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+            return score
+
+    def put_many(self, items):
+        with self._lock:
+            for key, score in items:
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+
+SCORE_CACHE = ScoreCache()
+
+
+def rerank(query, hits, top_k=RERANK_TOP_K, model=None, cache=SCORE_CACHE,
+           batch_size=RERANK_BATCH_SIZE):
+    """
+    Score (query, passage) pairs with the cross-encoder and keep the best
+    top_k hits, each with a "rerank_score". Only pairs missing from the
+    cache are sent to the model, in one batched predict call.
+    """
+    if not hits:
+        return []
+
+    query_key = " ".join(query.lower().split())
+    passages = [hit["data"].strip()[:RERANK_MAX_CHARS] for hit in hits]
+    keys = [(query_key, passage_hash(passage)) for passage in passages]
+    scores = [cache.get(key) for key in keys]
+
+    missing = [n for n, score in enumerate(scores) if score is None]
+    if missing:
+        model = model or load_model()
+        predicted = model.predict([(query, passages[n]) for n in missing],
+                                  batch_size=batch_size, show_progress_bar=False)
+        fresh = [(keys[n], float(score)) for n, score in zip(missing, predicted)]
+        cache.put_many(fresh)
+        for n, (_, score) in zip(missing, fresh):
+            scores[n] = score
+
+    order = sorted(range(len(hits)), key=lambda n: scores[n], reverse=True)[:top_k]
+    return [dict(hits[n], rerank_score=round(scores[n], 4)) for n in order]
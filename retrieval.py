@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+retrieval.py
+Concurrent search across several indexes, fused with reciprocal-rank fusion
+"""
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from reranker import RERANK_CANDIDATES, RERANK_ENABLED, RERANK_TOP_K, rerank
+from tracing import span
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+FANOUT_TOP_K_PER_INDEX = 8   # hits requested from each index
+FANOUT_TOP_K = 10            # fused hits kept overall
+FANOUT_MAX_WORKERS = 8
+RRF_K = 60                   # standard reciprocal-rank fusion constant
+CONTEXT_MAX_CHARS = 12000    # fused context budget sent to the agent
+
+# Answer single-index / rag_agent questions from a fused vector + BM25
+# context instead of letting the agent call the index tool itself
+HYBRID_RETRIEVAL = os.getenv("POLICY_NAVIGATOR_HYBRID", "0") == "1"
+
+
+def normalize_hits(response, index_id, index_name=""):
+    """
+    Search response -> list of hit dicts. "key" is index + chunk ID, the ID
+    keyword_index gives the same passage, so a chunk found by both searches
+    fuses into one hit while other chunks of its record stay separate.
+    """
+    hits = []
+    for item in getattr(response, "data", None) or []:
+        if not isinstance(item, dict):
+            continue
+        hit_id = item.get("id")
+        data = item.get("data") or ""
+        # Without a chunk ID, the passage text tells a record's chunks apart
+        key = hit_id or f"{item.get('document')}:{passage_key(data)}"
+        hits.append({
+            "key": f"{index_id}:{key}",
+            "index_id": index_id,
+            "index_name": index_name,
+            "id": hit_id or item.get("document"),
+            "document": item.get("document"),
+            "data": data,
+            "score": item.get("score"),
+            "metadata": item.get("metadata") or {},
+        })
+    return hits
+
+
+def search_index(index, query, top_k=FANOUT_TOP_K_PER_INDEX):
+    with span("index.search"):
+        response = index.search(query, top_k=top_k)
+    return normalize_hits(response, index.id, getattr(index, "name", ""))
+
+
+def fan_out_search(indexes, query, top_k_per_index=FANOUT_TOP_K_PER_INDEX,
+                   max_workers=FANOUT_MAX_WORKERS, keyword_search=None):
+    """
+    Search every index at once; with keyword_search(index_id, query, top_k)
+    each index's local keyword lookup runs in the same pool, alongside its
+    vector search. Returns (rankings, timings, errors): one hit list per
+    search that answered, label -> seconds and label -> exception.
+    """
+    searches = [(index.id, lambda index=index: search_index(index, query, top_k_per_index))
+                for index in indexes]
+    if keyword_search is not None:
+        searches += [(f"{index.id} (keyword)", lambda index=index: _named(
+                         keyword_search(index.id, query, top_k_per_index), index))
+                     for index in indexes]
+
+    def timed_search(search):
+        label, fn = search
+        started = time.perf_counter()
+        try:
+            return label, fn(), None, time.perf_counter() - started
+        except Exception as e:
+            return label, None, e, time.perf_counter() - started
+
+    rankings, timings, errors = [], {}, {}
+    if not searches:
+        return rankings, timings, errors
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(searches))) as pool:
+        for label, hits, error, seconds in pool.map(timed_search, searches):
+            timings[label] = seconds
+            if error is not None:
+                errors[label] = error
+            elif hits:
+                rankings.append(hits)
+    return rankings, timings, errors
+
+
+def _named(hits, index):
+    for hit in hits:
+        hit["index_name"] = getattr(index, "name", "")
+    return hits
+
+
+def passage_key(text):
+    return hashlib.sha1(" ".join(text.split()).lower().encode("utf-8")).hexdigest()
+
+
+def reciprocal_rank_fusion(rankings, top_k=FANOUT_TOP_K, k=RRF_K):
+    """
+    Merge ranked hit lists: score(hit) = sum over lists of 1 / (k + rank),
+    counting each key's best rank per list. Scores from different indexes
+    are not comparable, ranks are.
+    """
+    fused, hits = {}, {}
+    for ranking in rankings:
+        scored = set()
+        for rank, hit in enumerate(ranking, 1):
+            key = hit["key"]
+            if key not in scored:
+                scored.add(key)
+                fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+            hits.setdefault(key, hit)
+
+    ordered = sorted(fused, key=fused.get, reverse=True)[:top_k]
+    return [dict(hits[key], rrf_score=round(fused[key], 6)) for key in ordered]
+
+
+def select_hits(query, rankings, rerank_enabled=RERANK_ENABLED, top_k=FANOUT_TOP_K):
+    """
+    Fused hits for the answer context. With reranking, a wider fused
+    candidate set is scored by the cross-encoder and cut to RERANK_TOP_K;
+    if the model cannot run, the plain fused order is used instead.
+    """
+    if not rerank_enabled:
+        return reciprocal_rank_fusion(rankings, top_k=top_k)
+
+    candidates = reciprocal_rank_fusion(rankings, top_k=max(top_k, RERANK_CANDIDATES))
+    try:
+        with span("rerank"):
+            return rerank(query, candidates, top_k=RERANK_TOP_K)
+    except Exception as e:
+        print(f"⚠️ Rerank failed, using fused order: {e}")
+        return candidates[:top_k]
+
+
+def _source_label(hit):
+    meta = hit["metadata"]
+    source = meta.get("url") or meta.get("file_name") or meta.get("source") or hit["document"] or hit["id"]
+    if meta.get("page"):
+        source = f"{source}, page {meta['page']}"
+    return f"{hit['index_name'] or hit['index_id']} | {source}"
+
+
+def build_context(hits, max_chars=CONTEXT_MAX_CHARS):
+    """
+    Numbered passages with their source, trimmed to the character budget.
+    A passage already included under another hit is not repeated.
+    """
+    parts, used, seen = [], 0, set()
+    for hit in hits:
+        key = passage_key(hit["data"])
+        if key in seen:
+            continue
+        seen.add(key)
+        header = f"[{len(parts) + 1}] {_source_label(hit)}\n"
+        room = max_chars - used - len(header)
+        if room <= 0:
+            break
+        text = hit["data"].strip()[:room]
+        parts.append(header + text)
+        used += len(header) + len(text)
+    return "\n\n".join(parts)
+
+
+def fused_prompt(question, context):
+    return (
+        "Answer the question using only the retrieved passages below. They come "
+        "from several policy indexes; cite passages by their [number] and source "
+        "in a 'Citation' section. If they do not contain the answer, say so.\n\n"
+        f"Retrieved passages:\n{context}\n\n"
+        f"Question: {question}"
+    )
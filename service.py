@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+service.py
+Long-running HTTP query service sharing one warm agent and index handles
+
+Endpoints:
+  POST /ask        {"question": "..."}
+  POST /ingest     {"type": "csv" | "pdf" | "url" | "crawl", "source": "<path or URL>"}
+                   (off unless started with --enable-ingest; file paths are
+                   relative to the ingest directory, URLs must be public)
+  GET  /eo-status  ?number=14028[,14110]
+  GET  /health
+  GET  /metrics    (Prometheus text format)
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import rag_agent
+from crawler import is_public_url
+from index_catalog import get_catalog
+from slack_notifier import SlackNotifier
+from tracing import REGISTRY
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+HOST = "127.0.0.1"
+PORT = 8080
+MAX_CONCURRENT = 8      # requests doing work at the same time
+MAX_WAITING = 32        # queued requests before answering 503
+MAX_BODY_BYTES = 1024 * 1024
+READ_TIMEOUT = 30       # seconds to receive a request
+
+# /ingest reads server-side files and fetches URLs, so it is opt-in
+INGEST_ENABLED = os.getenv("POLICY_NAVIGATOR_SERVICE_INGEST", "0") == "1"
+INGEST_DIR = os.getenv("POLICY_NAVIGATOR_INGEST_DIR", "ingest")
+INGEST_EXTENSIONS = {"csv": ".csv", "pdf": ".pdf"}
+
+REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PolicyService:
+    """
+    Loads the agent, Slack tool and index handles once, then serves
+    requests concurrently. Blocking SDK calls run in a thread pool sized
+    to MAX_CONCURRENT; beyond MAX_WAITING queued requests the service
+    sheds load with 503 + Retry-After instead of queueing without bound.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT, max_waiting=MAX_WAITING,
+                 ingest_enabled=INGEST_ENABLED, ingest_dir=INGEST_DIR):
+        self.max_waiting = max_waiting
+        self.ingest_enabled = ingest_enabled
+        self.ingest_dir = ingest_dir
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="svc")
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.waiting = 0
+        self.agent = None
+        self.notifier = None
+        self.started_at = time.time()
+
+    def warm_up(self):
+        self.agent = rag_agent.load_agent()
+        slack_tool = rag_agent.load_slack_tool(self.agent)
+        if slack_tool:
+            self.notifier = SlackNotifier(
+                lambda channel, text: rag_agent.post_slack_message(slack_tool, channel, text)
+            )
+
+        catalog = get_catalog(rag_agent.index_factory())
+        for index_id in (rag_agent.CSV_INDEX_ID, rag_agent.PDF_INDEX_ID, rag_agent.WEB_INDEX_ID):
+            try:
+                catalog.get(index_id)
+            except Exception as e:
+                print(f"⚠️ Could not preload index {index_id}: {e}")
+
+    async def run_blocking(self, fn, *args):
+        if self.waiting >= self.max_waiting:
+            raise HttpError(503, "Server busy, retry later")
+
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.slots.release()
+
+    # ---------- endpoints ----------
+    async def ask(self, body):
+        question = (body.get("question") or "").strip()
+        if not question:
+            raise HttpError(400, "Missing 'question'")
+
+        started = time.perf_counter()
+        route, answer = await self.run_blocking(rag_agent.answer_question, self.agent, question)
+        if self.notifier:
+            self.notifier.notify(rag_agent.SLACK_CHANNEL, f"*Policy Navigator Update:*\n{answer}")
+        return {"route": route, "answer": answer, "latency_s": round(time.perf_counter() - started, 4)}
+
+    async def ingest(self, body):
+        if not self.ingest_enabled:
+            raise HttpError(403, "Ingestion is disabled; start the service with --enable-ingest")
+        kind, source = body.get("type"), body.get("source")
+        if kind not in ("csv", "pdf", "url", "crawl") or not isinstance(source, str) or not source:
+            raise HttpError(400, "Expected {'type': 'csv'|'pdf'|'url'|'crawl', 'source': ...}")
+
+        started = time.perf_counter()
+        result = await self.run_blocking(self.run_ingest, kind, source)
+        return dict(result, type=kind, source=source, latency_s=round(time.perf_counter() - started, 4))
+
+    def run_ingest(self, kind, source):
+        if kind in INGEST_EXTENSIONS:
+            path = resolve_ingest_file(self.ingest_dir, source, INGEST_EXTENSIONS[kind])
+            ingest = rag_agent.ingest_csv if kind == "csv" else rag_agent.ingest_pdf
+            if not ingest(path):
+                raise HttpError(500, f"{kind.upper()} ingestion failed; see the service log")
+            return {}
+
+        check_public_url(source)
+        if kind == "url":
+            if not rag_agent.ingest_url(source):
+                raise HttpError(500, "URL ingestion failed; see the service log")
+            return {}
+
+        summary = rag_agent.crawl_website([source], public_only=True)
+        if summary is None:
+            raise HttpError(500, "Crawl failed; see the service log")
+        counts = {k: v for k, v in summary.items() if k != "ids"}
+        if summary["failed_upserts"] or summary["failed_deletes"]:
+            raise HttpError(500, f"Crawl index updates failed: {counts}")
+        return {"pages": counts}
+
+    async def eo_status(self, query):
+        raw = ",".join(query.get("number", []))
+        # Bare numbers here, not a question: no "EO" introducer to look for
+        items = [item.strip() for item in raw.split(",") if item.strip()]
+        numbers = list(dict.fromkeys(items))
+        if not numbers or not all(item.isdigit() and 4 <= len(item) <= 6 for item in numbers):
+            raise HttpError(400, "Expected ?number=<EO number>[,<EO number>...]")
+
+        answer = await self.run_blocking(rag_agent.check_executive_order_statuses, numbers)
+        return {"numbers": numbers, "answer": answer}
+
+    async def dispatch(self, method, path, query, body):
+        if path == "/health":
+            return {"status": "ok", "uptime_s": round(time.time() - self.started_at, 1),
+                    "waiting": self.waiting}
+
+        routes = {
+            "/ask": ("POST", lambda: self.ask(body)),
+            "/ingest": ("POST", lambda: self.ingest(body)),
+            "/eo-status": ("GET", lambda: self.eo_status(query)),
+        }
+        if path not in routes:
+            raise HttpError(404, "Not found")
+        expected, handler = routes[path]
+        if method != expected:
+            raise HttpError(405, f"Use {expected}")
+        return await handler()
+
+    # ---------- HTTP plumbing ----------
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), READ_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HttpError as e:
+                    write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                method, target, headers, raw_body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                url = urlsplit(target)
+
+                if method == "GET" and url.path == "/metrics":
+                    write_response(writer, 200, REGISTRY.render_prometheus(), keep_alive,
+                                   content_type="text/plain; version=0.0.4")
+                    await writer.drain()
+                    if not keep_alive:
+                        break
+                    continue
+
+                try:
+                    try:
+                        body = json.loads(raw_body or b"{}") if method == "POST" else {}
+                    except ValueError:
+                        raise HttpError(400, "Body must be JSON")
+                    payload = await self.dispatch(method, url.path, parse_qs(url.query), body)
+                    status = 200
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                extra = {"Retry-After": "1"} if status == 503 else {}
+                write_response(writer, status, payload, keep_alive, extra)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 Policy Navigator service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def resolve_ingest_file(ingest_dir, source, extension):
+    """
+    Path of an existing file inside ingest_dir; anything outside it
+    (absolute paths, "..", symlinks) is refused
+    """
+    root = os.path.realpath(ingest_dir)
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root:
+        raise HttpError(403, "Files must be inside the ingest directory")
+    if not path.lower().endswith(extension):
+        raise HttpError(400, f"Expected a {extension} file")
+    if not os.path.isfile(path):
+        raise HttpError(404, f"No such file in the ingest directory: {source}")
+    return path
+
+
+def check_public_url(url):
+    """
+    Only http(s) URLs whose host resolves to public addresses, so callers
+    cannot make the service fetch internal endpoints. Crawls re-check every
+    redirect and link (public_only).
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise HttpError(400, "Expected an http(s) URL")
+    if not is_public_url(url):
+        raise HttpError(403, f"{parts.hostname} is not a public host (or cannot be resolved)")
+
+
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError:
+        raise HttpError(400, "Invalid Content-Length")
+    if length < 0:
+        raise HttpError(400, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target, headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True, extra_headers=None,
+                   content_type="application/json; charset=utf-8"):
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    headers = {
+        "Content-Type": content_type,
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+    }
+    headers.update(extra_headers or {})
+    head = f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+    head += "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+    writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Policy Navigator HTTP service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--max-concurrent", type=int, default=MAX_CONCURRENT)
+    parser.add_argument("--max-waiting", type=int, default=MAX_WAITING)
+    parser.add_argument("--enable-ingest", action="store_true", default=INGEST_ENABLED,
+                        help="Allow POST /ingest (also POLICY_NAVIGATOR_SERVICE_INGEST=1)")
+    parser.add_argument("--ingest-dir", default=INGEST_DIR,
+                        help="Directory CSV/PDF ingest paths are resolved in")
+    args = parser.parse_args()
+
+    async def run():
+        service = PolicyService(args.max_concurrent, args.max_waiting,
+                                args.enable_ingest, args.ingest_dir)
+        service.warm_up()
+        await service.serve(args.host, args.port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nService stopped.")
+
+
+if __name__ == "__main__":
+    main()
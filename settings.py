@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+settings.py
+Settings shared by several modules
+"""
+import os
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+# Root for every local cache: manifest, catalog, indexes, crawl state, HTTP cache
+CACHE_DIR = os.getenv("POLICY_NAVIGATOR_CACHE_DIR", ".policy_navigator")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+slack_notifier.py
+Background Slack notification queue with per-channel digests and retries
+"""
+import queue
+import threading
+import time
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+SLACK_DIGEST_WINDOW = 10.0   # seconds to collect messages into one digest
+SLACK_QUEUE_SIZE = 256
+SLACK_MAX_RETRIES = 4
+SLACK_RETRY_DELAY = 1.0      # doubled after every failed attempt
+DIGEST_SEPARATOR = "\n\n———\n\n"
+
+_STOP = object()
+
+
+class SlackNotifier:
+    """
+    notify() only enqueues, so the answer path never waits on Slack.
+
+    A worker thread waits for the first message, keeps collecting for
+    `window` seconds, then posts one digest per channel with retries.
+    When the queue is full new messages are dropped with a warning.
+    """
+
+    def __init__(self, send_fn, window=SLACK_DIGEST_WINDOW, max_queue=SLACK_QUEUE_SIZE,
+                 max_retries=SLACK_MAX_RETRIES, retry_delay=SLACK_RETRY_DELAY):
+        self.send_fn = send_fn  # send_fn(channel, text); raises on failure
+        self.window = window
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="slack-notifier", daemon=True)
+        self._thread.start()
+
+    def notify(self, channel, message):
+        try:
+            self._queue.put_nowait((channel, message))
+            return True
+        except queue.Full:
+            print("⚠️ Slack queue full, notification dropped")
+            return False
+
+    def close(self, timeout=None):
+        """
+        Flush pending messages and stop the worker
+        """
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            pending = {}
+            pending.setdefault(item[0], []).append(item[1])
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.setdefault(item[0], []).append(item[1])
+
+            for channel, messages in pending.items():
+                self._send_with_retry(channel, DIGEST_SEPARATOR.join(messages), len(messages))
+
+    def _send_with_retry(self, channel, text, count):
+        delay = self.retry_delay
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.send_fn(channel, text)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"⚠️ Slack digest to {channel} failed ({count} message(s)): {e}")
+                    return False
+                time.sleep(delay)
+                delay *= 2
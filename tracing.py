@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+tracing.py
+Lightweight per-stage timing spans aggregated into Prometheus histograms
+"""
+import atexit
+import bisect
+import functools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+METRIC_NAME = "policy_navigator_stage_seconds"
+ERRORS_NAME = "policy_navigator_stage_errors_total"
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+METRICS_FILE = os.getenv("POLICY_NAVIGATOR_METRICS_FILE")
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[slot] += 1
+            self.total += seconds
+            self.count += 1
+            if error:
+                self.errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.count, self.errors
+
+
+class Registry:
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage):
+        h = self._histograms.get(stage)
+        if h is None:
+            with self._lock:
+                h = self._histograms.setdefault(stage, Histogram())
+        return h
+
+    def observe(self, stage, seconds, error=False):
+        self.histogram(stage).observe(seconds, error)
+
+    def render_prometheus(self):
+        """
+        Prometheus text exposition format (version 0.0.4)
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent per pipeline stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        errors = [
+            f"# HELP {ERRORS_NAME} Failed calls per pipeline stage.",
+            f"# TYPE {ERRORS_NAME} counter",
+        ]
+        for stage in sorted(self._histograms):
+            counts, total, count, failed = self._histograms[stage].snapshot()
+            cumulative = 0
+            for bound, n in zip(self._histograms[stage].buckets, counts):
+                cumulative += n
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {count}')
+            errors.append(f'{ERRORS_NAME}{{stage="{stage}"}} {failed}')
+        return "\n".join(lines + errors) + "\n"
+
+    def write(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+REGISTRY = Registry()
+
+
+@contextmanager
+def span(stage):
+    """
+    Time the enclosed block under `stage`; exceptions are counted and re-raised
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        REGISTRY.observe(stage, time.perf_counter() - started, error=True)
+        raise
+    REGISTRY.observe(stage, time.perf_counter() - started)
+
+
+def traced(stage):
+    """
+    Decorator form of span()
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_call(stage, fn, *args, **kwargs):
+    with span(stage):
+        return fn(*args, **kwargs)
+
+
+def export_on_exit(path=METRICS_FILE):
+    """
+    Write the metrics file when the process exits (no-op without a path)
+    """
+    if path:
+        atexit.register(REGISTRY.write, path)